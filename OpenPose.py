@@ -1,16 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional
 import cv2
+import json
 import os
 import numpy as np
 
+try:
+    import ijson  # Optional: streams "people" entries instead of loading the whole document
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # Optional: faster parsing and encoding than the stdlib json module
+except ImportError:
+    orjson = None
+
 from Pose import Pose 
+from scaling import ScalingContext, precompute_scaling_context
 
-from visualization import build_pose_graph, draw_pose_with_graph, create_graphs_for_poses
+from visualization import collect_pose_primitives, draw_primitives
 
 class OpenPoseError(Exception):
     pass
 
+_JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else (json.JSONDecodeError,)
+
+def _process_person(person: Dict) -> Dict:
+    """Ensures all keypoint lists of a "people" entry are iterable and not None."""
+    person["pose_keypoints_2d"] = person.get("pose_keypoints_2d") or []
+    person["face_keypoints_2d"] = person.get("face_keypoints_2d") or []
+    person["hand_left_keypoints_2d"] = person.get("hand_left_keypoints_2d") or []
+    person["hand_right_keypoints_2d"] = person.get("hand_right_keypoints_2d") or []
+    return person
+
 @dataclass
 class OpenPose:
     """
@@ -47,8 +70,6 @@ class OpenPose:
 
     @classmethod
     def load(cls, file_path: str) -> "OpenPose":
-        import json
-
         def validate_and_process_data(data):
             """
             Validates and processes the loaded JSON data.
@@ -58,16 +79,21 @@ class OpenPose:
                 raise OpenPoseError(f"The data format is invalid: {data}")
 
             for person in data.get("people", []):
-                person["pose_keypoints_2d"] = person.get("pose_keypoints_2d") or []
-                person["face_keypoints_2d"] = person.get("face_keypoints_2d") or []
-                person["hand_left_keypoints_2d"] = person.get("hand_left_keypoints_2d") or []
-                person["hand_right_keypoints_2d"] = person.get("hand_right_keypoints_2d") or []
+                _process_person(person)
 
             return data
 
         try:
-            with open(file_path, "r") as file:
-                raw_data = json.load(file)
+            if ijson is not None:
+                with open(file_path, "rb") as file:
+                    return cls._load_stream(file)
+
+            if orjson is not None:
+                with open(file_path, "rb") as file:
+                    raw_data = orjson.loads(file.read())
+            else:
+                with open(file_path, "r") as file:
+                    raw_data = json.load(file)
 
             # Handle case where top-level JSON is a list
             if isinstance(raw_data, list) and len(raw_data) > 0:
@@ -81,17 +107,65 @@ class OpenPose:
 
         except FileNotFoundError:
             raise OpenPoseError(f"The file at {file_path} was not found.")
-        except json.JSONDecodeError:
+        except _JSON_ERRORS:
             raise OpenPoseError(f"The file at {file_path} contains invalid JSON.")
         except Exception as e:
             raise RuntimeError(f"An unexpected error occurred while loading the file: {e}")
 
+    @classmethod
+    def _load_stream(cls, file: BinaryIO) -> "OpenPose":
+        """
+        Builds an OpenPose object with ijson, turning each "people" entry into a Pose as soon as it
+        has been parsed so the raw document is never held in memory as a whole.
+        """
+        events = ijson.parse(file, use_float=True)
+        _, root_event, _ = next(events)
+
+        # Like the non-streaming path, only the first entry of a top-level list is read
+        root = "item" if root_event == "start_array" else ""
+        prefix = f"{root}." if root else ""
+        people_prefix = f"{prefix}people.item"
+        canvas = {f"{prefix}canvas_width": 0, f"{prefix}canvas_height": 0}
+
+        people = []
+        has_people = False
+        builder = None
+        for path, event, value in events:
+            if builder is not None:
+                builder.event(event, value)
+                if path == people_prefix and event == "end_map":
+                    people.append(Pose.from_json(_process_person(builder.value), 0, 0))
+                    builder = None
+            elif path == people_prefix and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif path == f"{prefix}people" and event == "start_array":
+                has_people = True
+            elif path in canvas and event == "number":
+                canvas[path] = value
+            elif path == root and event == "end_map":
+                break
+
+        if not has_people:
+            raise OpenPoseError("The data format is invalid: no 'people' list found.")
+
+        canvas_width, canvas_height = canvas.values()
+        # The canvas size may follow "people" in the file, so it is applied once parsing is done
+        for pose in people:
+            pose.canvas_width = canvas_width
+            pose.canvas_height = canvas_height
+
+        return cls(people=people, canvas_width=canvas_width, canvas_height=canvas_height)
+
 
     def save(self, file_path: str) -> None:
-        import json
         try:
-            with open(file_path, "w") as file:
-                json.dump(self.to_json(), file, indent=4)
+            if orjson is not None:
+                with open(file_path, "wb") as file:
+                    file.write(orjson.dumps(self.to_json(), option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(file_path, "w") as file:
+                    json.dump(self.to_json(), file, indent=4)
         except PermissionError:
             raise OpenPoseError(f"Permission denied when trying to save to {file_path}.")
         except Exception as e:
@@ -140,6 +214,49 @@ class OpenPose:
             pose = self.people[index]
             self.people[index] = pose.scale(target_gender, target_age)
 
+    def scale_pose_with_context(self, index: int, context: ScalingContext, age_index: int) -> None:
+        """
+        Scales a Pose object at the specified index to one of the targets of a precomputed
+        ScalingContext (see precompute_scaling_context).
+        """
+        if 0 <= index < len(self.people):
+            pose = self.people[index]
+            self.people[index] = pose.scale_with_context(context, [age_index])[0]
+
+    def save_scaled_ages(
+        self, target_gender: str, target_ages: List[int], file_stem: str, max_workers: Optional[int] = None
+    ) -> None:
+        """
+        Scales all poses to every target age and saves each age as "{file_stem}_{age}.json" and
+        "{file_stem}_{age}.png".
+
+        Each pose is scaled to all ages in one batched pass; drawing, encoding and writing the
+        per-age outputs then run on a thread pool, one OpenPose and canvas per age, with image
+        encoding and file writes releasing the GIL.
+
+        Parameters:
+            target_gender (str): The target gender for all scaled poses.
+            target_ages (List[int]): The target ages, one output pair per age.
+            file_stem (str): Path prefix of the output files.
+            max_workers (Optional[int]): Thread pool size; the ThreadPoolExecutor default when None.
+        """
+        context = precompute_scaling_context(target_gender, target_ages)
+        scaled_people = [pose.scale_with_context(context) for pose in self.people]
+
+        def save_age(age_index: int) -> None:
+            scaled = OpenPose(
+                people=[poses[age_index] for poses in scaled_people],
+                canvas_width=self.canvas_width,
+                canvas_height=self.canvas_height,
+            )
+            file_name = f"{file_stem}_{context.ages[age_index]}"
+            scaled.save(f"{file_name}.json")
+            scaled.save_as_image(f"{file_name}.png")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() re-raises the first error of any age
+            list(executor.map(save_age, range(len(context.ages))))
+
     def guess_age(self, index: int) -> Optional[int]:
         """
         Guesses the age of the person at the specified index.
@@ -156,47 +273,62 @@ class OpenPose:
             return self.people[index].guess_gender()
         return None
 
-    def draw(self) -> np.ndarray:
+    def draw(self, canvas_out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Renders all poses on a canvas and returns the resulting image.
 
+        Parameters:
+            canvas_out (Optional[np.ndarray]): A (height, width, 3) uint8 buffer to draw into. It is cleared
+                                               before drawing, so callers rendering many frames can allocate it once.
+
         Returns:
             np.ndarray: The canvas with all poses drawn.
         """
-        import numpy as np
-
-        # Create a blank canvas
-        canvas = np.zeros((self.canvas_height, self.canvas_width, 3), dtype=np.uint8)
-
-        # Build graphs for all poses
-        graphs = create_graphs_for_poses(self.people)
-
-        # Draw each pose with its corresponding graph
-        for pose, graph in zip(self.people, graphs):
-            draw_pose_with_graph(canvas, pose, graph)
+        if canvas_out is None:
+            # Create a blank canvas
+            canvas = np.zeros((self.canvas_height, self.canvas_width, 3), dtype=np.uint8)
+        else:
+            if canvas_out.shape != (self.canvas_height, self.canvas_width, 3) or canvas_out.dtype != np.uint8:
+                raise ValueError(
+                    f"canvas_out must be a ({self.canvas_height}, {self.canvas_width}, 3) uint8 array, "
+                    f"got {canvas_out.shape} {canvas_out.dtype}."
+                )
+            canvas = canvas_out
+            canvas.fill(0)
+
+        # Gather the lines and dots of every pose, then draw them with one call per color; all dots
+        # end up above all lines (see draw_primitives for the z-order)
+        segments, points = {}, {}
+        for pose in self.people:
+            collect_pose_primitives(pose, segments, points)
+        draw_primitives(canvas, segments, points)
 
         return canvas
 
-    def save_as_image(self, file_path: str) -> None:
+    def save_as_image(self, file_path: str, canvas_out: Optional[np.ndarray] = None) -> None:
         """
         Saves the rendered image of the OpenPose object to a file.
 
         Parameters:
             file_path (str): The file path to save the image, including the extension (e.g., 'output.png').
+            canvas_out (Optional[np.ndarray]): Reusable drawing buffer, passed through to draw().
         """
         # Draw the image
-        canvas = self.draw()
+        canvas = self.draw(canvas_out)
 
-        success = cv2.imwrite(file_path, canvas)
+        # Encode in memory and write the bytes ourselves; imencode releases the GIL, so batch callers
+        # can save from a thread pool while the next pose is being rendered
+        try:
+            success, buffer = cv2.imencode(os.path.splitext(file_path)[1], canvas)
+        except cv2.error as e:
+            raise RuntimeError(f"Failed to encode image for {file_path}: {e}")
         if not success:
             raise RuntimeError(f"Failed to save image to {file_path}.")
 
-        """
-        # Save the image
         try:
-            success = cv2.imwrite(file_path, canvas)
-            if not success:
-                raise OpenPoseError(f"Failed to save image to {file_path}.")
-        except Exception as e:
-            raise RuntimeError(f"An unexpected error occurred while saving the image: {e}")
-        """
\ No newline at end of file
+            with open(file_path, 'wb') as f:
+                f.write(buffer.tobytes())
+        except PermissionError:
+            raise OpenPoseError(f"Permission denied when trying to save image to {file_path}.")
+        except OSError as e:
+            raise RuntimeError(f"Failed to save image to {file_path}: {e}")
@@ -1,9 +1,13 @@
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from math import hypot
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 import numpy as np
 import logging
 
-from anchor_point import choose_main_support_with_gravity, dict_to_keypoints_array
+from anchor_point import choose_main_support_with_gravity, xy_to_keypoints_array, COCO_KEYPOINTS_ORDER
 from scaling import *
 
 connections = {
@@ -27,40 +31,293 @@ connections = {
     "LEar": ["LEye"]
 }
 
-@dataclass
+# Fixed name -> row index into the (18, 2) body keypoint array
+JOINT_INDEX = {name: i for i, name in enumerate(COCO_KEYPOINTS_ORDER)}
+
+def _bfs_edges(root: str) -> List[Tuple[str, str]]:
+    """Returns the (parent, child) edges of the `connections` tree in breadth-first order from `root`."""
+    visited = {root}
+    queue = deque((root,))
+    edges = []
+    while queue:
+        current = queue.popleft()
+        for connection in connections.get(current, []):
+            if connection not in visited:
+                visited.add(connection)
+                queue.append(connection)
+                edges.append((current, connection))
+    return edges
+
+# Skeleton edges as (parent, child) pairs, in BFS order from the Neck
+EDGE_NAMES = _bfs_edges("Neck")
+# Scaling factor key of each edge, in EDGE_NAMES order
+EDGE_RATIO_KEYS = [get_edge_ratio_key(p, c) for p, c in EDGE_NAMES]
+# Column of each edge's factor in the SCALING_KEYS-ordered factor rows, in EDGE_NAMES order
+EDGE_RATIO_COLUMNS = np.array([SCALING_KEYS.index(key) for key in EDGE_RATIO_KEYS], dtype=np.intp)
+
+def _bfs_order(root: str) -> np.ndarray:
+    """Returns (parent, child, edge index) rows for the whole skeleton in BFS order from `root`."""
+    edge_index = {frozenset(edge): i for i, edge in enumerate(EDGE_NAMES)}
+    return np.array(
+        [(JOINT_INDEX[p], JOINT_INDEX[c], edge_index[frozenset((p, c))]) for p, c in _bfs_edges(root)],
+        dtype=np.int32,
+    )
+
+# Traversal order for every joint that can be chosen as anchor
+BFS_ORDER = {name: _bfs_order(name) for name in JOINT_INDEX}
+
+def _path_matrix(order: np.ndarray) -> np.ndarray:
+    """Returns a (joints, edges) matrix holding 1 where a row of `order` lies on the path from the root to a joint."""
+    paths = np.zeros((len(JOINT_INDEX), len(order)))
+    for row, (parent, child, _) in enumerate(order.tolist()):
+        paths[child] = paths[parent]
+        paths[child, row] = 1.0
+    return paths
+
+# Root-to-joint paths matching BFS_ORDER, for every anchor
+BFS_PATHS = {name: _path_matrix(order) for name, order in BFS_ORDER.items()}
+
+def _edge_vectors(body_xy: np.ndarray, anchor: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Edge vectors of the BFS traversal from `anchor`, and which of them are present and non-zero."""
+    traversal = BFS_ORDER[anchor]
+    vectors = body_xy[traversal[:, 1]] - body_xy[traversal[:, 0]]
+    norms = np.hypot(vectors[:, 0], vectors[:, 1])
+    # Missing joints give NaN norms, which fail this test as well
+    return vectors, norms > 1e-6
+
+def _unreachable_joints(body_xy: np.ndarray, anchor: str) -> np.ndarray:
+    """Mask of the joints that sit behind a missing or zero-length edge when walking out from `anchor`."""
+    _, usable = _edge_vectors(body_xy, anchor)
+    return BFS_PATHS[anchor] @ ~usable > 0
+
+def _bfs_scale(body_xy: np.ndarray, anchor: str, edge_factors: np.ndarray, height_ratio: float) -> np.ndarray:
+    """
+    Rebuilds the skeleton outwards from `anchor` with every edge scaled by its factor and `height_ratio`.
+
+    Each joint is the anchor plus the scaled edge vectors on its path, so the whole traversal is one
+    product with the precomputed path matrix. Joints behind a missing or zero-length edge are NaN.
+    Passing (A, edges) factors and (A,) height ratios rebuilds A skeletons at once as an (A, 18, 2) array.
+    """
+    traversal = BFS_ORDER[anchor]
+    paths = BFS_PATHS[anchor]
+    vectors, usable = _edge_vectors(body_xy, anchor)
+
+    # direction * (norm * factor * height_ratio) == vector * factor * height_ratio
+    scales = np.asarray(edge_factors)[..., traversal[:, 2]] * np.asarray(height_ratio)[..., None]
+    scaled_vectors = vectors * scales[..., None]
+    scaled_vectors[..., ~usable, :] = 0.0
+
+    scaled = body_xy[JOINT_INDEX[anchor]] + paths @ scaled_vectors
+    scaled[..., paths @ ~usable > 0, :] = np.nan
+    return scaled
+
+def body_dict_to_array(body: Dict[str, Optional[Tuple[float, float]]]) -> np.ndarray:
+    """
+    Converts a {name: (x, y)} dict to an (18, 2) array; missing or None joints are NaN.
+    Raises ValueError for a name that is not one of the COCO keypoints.
+    """
+    body_xy = np.full((len(JOINT_INDEX), 2), np.nan)
+    for name, point in body.items():
+        if name not in JOINT_INDEX:
+            raise ValueError(f"Unknown body keypoint '{name}'.")
+        if point is not None:
+            body_xy[JOINT_INDEX[name]] = point
+    return body_xy
+
+def body_array_to_dict(body_xy: np.ndarray) -> Dict[str, Tuple[float, float]]:
+    """Converts an (18, 2) body array back to a {name: (x, y)} dict of the joints that are present."""
+    return {
+        name: (float(body_xy[i, 0]), float(body_xy[i, 1]))
+        for i, name in enumerate(COCO_KEYPOINTS_ORDER)
+        if not np.isnan(body_xy[i]).any()
+    }
+
+def crop_to_canvas(points_xy: np.ndarray, width: float, height: float) -> np.ndarray:
+    """Drops (sets to NaN, in place) the points outside [0, width] x [0, height] and returns the array."""
+    points_xy[~np.all((points_xy >= 0) & (points_xy <= (width, height)), axis=1)] = np.nan
+    return points_xy
+
+# (body row, scaling factor key) each hand and foot is aligned on, in _scaled_pose part order
+EXTREMITY_BASES = (
+    (JOINT_INDEX["LWrist"], "hand_ratio"),
+    (JOINT_INDEX["RWrist"], "hand_ratio"),
+    (JOINT_INDEX["LAnkle"], "foot_ratio"),
+    (JOINT_INDEX["RAnkle"], "foot_ratio"),
+)
+
+# Joints each body-proportion heuristic needs
+_REQUIRED_GENDER_KEYS = frozenset(("Neck", "RHip", "RKnee", "RAnkle"))
+_REQUIRED_HEAD_KEYS = frozenset(("Neck", "Nose"))
+_REQUIRED_TORSO_KEYS = frozenset(("Neck", "RHip", "LHip"))
+
+@lru_cache(maxsize=4)
+def _age_ratio_table(gender: str) -> np.ndarray:
+    """Torso-to-head ratio for the predefined ages 0 to 20, indexed by age."""
+    ratios = []
+    for age in range(0, 21):
+        scaling_factors = get_scaling_factors(age, gender)
+        ratios.append(scaling_factors["torso_ratio"] / scaling_factors["head_ratio"])
+    return np.array(ratios)
+
+def points_to_array(points: List[Optional[Tuple[float, float]]]) -> np.ndarray:
+    """Converts a list of optional (x, y) points to an (N, 2) array; None entries are NaN."""
+    return np.array([(np.nan, np.nan) if p is None else p for p in points], dtype=float).reshape(-1, 2)
+
+def array_to_points(points_xy: np.ndarray) -> List[Optional[Tuple[float, float]]]:
+    """Converts an (N, 2) array back to a list of optional (x, y) points; NaN rows become None."""
+    return [None if np.isnan(p).any() else (float(p[0]), float(p[1])) for p in points_xy]
+
+def valid_mask(points_xy: np.ndarray) -> np.ndarray:
+    """Boolean (N,) mask of the rows of an (N, 2) point array that are present (not NaN)."""
+    return ~np.isnan(points_xy).any(axis=1)
+
+def _flat_keypoints(points_xy: np.ndarray) -> List[float]:
+    """Flattens (N, 2) points to OpenPose's [x, y, c, ...] layout; missing points become (0, 0, 0)."""
+    valid = valid_mask(points_xy)
+    out = np.zeros((len(points_xy), 3))
+    out[valid, :2] = points_xy[valid]
+    out[valid, 2] = 1.0
+    return out.ravel().tolist()
+
+def _points_property(attr: str) -> property:
+    """
+    Tuple-of-optional-(x, y) snapshot of one of the (N, 2) part arrays of a Pose. The snapshot is
+    read-only so that item assignment fails instead of being lost; assign a whole new list to update.
+    """
+    def getter(self) -> Tuple[Optional[Tuple[float, float]], ...]:
+        return tuple(array_to_points(getattr(self, attr)))
+
+    def setter(self, points: List[Optional[Tuple[float, float]]]) -> None:
+        setattr(self, attr, points_to_array(points))
+
+    return property(getter, setter, doc=f"Keypoints as a read-only tuple of optional (x, y), built from `{attr}`.")
+
+def _no_points() -> np.ndarray:
+    return np.empty((0, 2))
+
+# Keypoint array fields of Pose and the list/dict keyword each one was constructed from before
+_POINT_FIELDS = ("face_xy", "right_hand_xy", "left_hand_xy", "right_foot_xy", "left_foot_xy")
+_LEGACY_KEYWORDS = {"body": "body_xy", "face": "face_xy", "right_hand": "right_hand_xy",
+                    "left_hand": "left_hand_xy", "right_foot": "right_foot_xy", "left_foot": "left_foot_xy"}
+
+@dataclass(eq=False, init=False)
 class Pose:
     """
     Represents the data of a single entry in the "people" key of an OpenPose JSON.
     """
-    body: Dict[str, Tuple[float, float]] = field(default_factory=dict)
-    face: List[Optional[Tuple[float, float]]] = field(default_factory=list)
-    right_hand: List[Optional[Tuple[float, float]]] = field(default_factory=list)
-    left_hand: List[Optional[Tuple[float, float]]] = field(default_factory=list)
-    right_foot: List[Optional[Tuple[float, float]]] = field(default_factory=list)
-    left_foot: List[Optional[Tuple[float, float]]] = field(default_factory=list)
+    body_xy: np.ndarray = field(default_factory=lambda: np.full((len(JOINT_INDEX), 2), np.nan))
+    # Face, hands and feet as (N, 2) arrays, NaN for missing points
+    face_xy: np.ndarray = field(default_factory=_no_points)
+    right_hand_xy: np.ndarray = field(default_factory=_no_points)
+    left_hand_xy: np.ndarray = field(default_factory=_no_points)
+    right_foot_xy: np.ndarray = field(default_factory=_no_points)
+    left_foot_xy: np.ndarray = field(default_factory=_no_points)
     canvas_width: int = None
     canvas_height: int = None
     input_gender: Optional[str] = None
     input_age: Optional[int] = None
+    # Body measurements behind guess_gender / guess_age, computed once per set of body keypoints
+    # (see _body_guess_cache)
+    _guess_cache: Dict[str, Optional[object]] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __init__(
+        self,
+        body_xy=None,
+        face_xy=None,
+        right_hand_xy=None,
+        left_hand_xy=None,
+        right_foot_xy=None,
+        left_foot_xy=None,
+        canvas_width: int = None,
+        canvas_height: int = None,
+        input_gender: Optional[str] = None,
+        input_age: Optional[int] = None,
+        **legacy,
+    ):
+        """
+        Keypoints may be given as (N, 2) arrays, or as the {name: (x, y)} body dict and lists of
+        optional (x, y) points used before; the keywords body, face, right_hand, left_hand,
+        right_foot and left_foot are still accepted for the latter.
+        """
+        arrays = {"body_xy": body_xy, "face_xy": face_xy, "right_hand_xy": right_hand_xy,
+                  "left_hand_xy": left_hand_xy, "right_foot_xy": right_foot_xy, "left_foot_xy": left_foot_xy}
+        for keyword, value in legacy.items():
+            if keyword not in _LEGACY_KEYWORDS:
+                raise TypeError(f"Pose.__init__() got an unexpected keyword argument '{keyword}'")
+            if arrays[_LEGACY_KEYWORDS[keyword]] is not None:
+                raise TypeError(f"Pose.__init__() got both '{keyword}' and '{_LEGACY_KEYWORDS[keyword]}'")
+            arrays[_LEGACY_KEYWORDS[keyword]] = value
+
+        self._guess_cache = {}
+        body_xy = arrays.pop("body_xy")
+        if body_xy is None:
+            body_xy = np.full((len(JOINT_INDEX), 2), np.nan)
+        elif isinstance(body_xy, dict):
+            body_xy = body_dict_to_array(body_xy)
+        else:
+            body_xy = np.asarray(body_xy, dtype=float)
+            if body_xy.shape != (len(JOINT_INDEX), 2):
+                raise ValueError(f"body_xy must have shape ({len(JOINT_INDEX)}, 2), got {body_xy.shape}.")
+        self.body_xy = body_xy
+        for attr, points in arrays.items():
+            if points is None:
+                points = _no_points()
+            elif not isinstance(points, np.ndarray):
+                points = points_to_array(points)
+            setattr(self, attr, points)
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.input_gender = input_gender
+        self.input_age = input_age
+
+    def _body_guess_cache(self) -> Dict[str, Optional[object]]:
+        """
+        The guess cache for the current body keypoints. It is keyed on the bytes of `body_xy`, so it
+        is emptied whenever the body changed since it was filled, whether by assignment or in place.
+        """
+        key = (self.body_xy.shape, self.body_xy.tobytes())
+        if self._guess_cache.get("body") != key:
+            self._guess_cache.clear()
+            self._guess_cache["body"] = key
+        return self._guess_cache
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            all(np.array_equal(getattr(self, attr), getattr(other, attr), equal_nan=True)
+                for attr in ("body_xy",) + _POINT_FIELDS)
+            and (self.canvas_width, self.canvas_height, self.input_gender, self.input_age)
+            == (other.canvas_width, other.canvas_height, other.input_gender, other.input_age)
+        )
+
+    @property
+    def body(self) -> Mapping[str, Tuple[float, float]]:
+        """
+        Body keypoints as a read-only {name: (x, y)} mapping, built from `body_xy`. Item assignment
+        fails instead of being lost; assign a whole new dict (or to `body_xy`) to update.
+        """
+        return MappingProxyType(body_array_to_dict(self.body_xy))
+
+    @body.setter
+    def body(self, body: Dict[str, Optional[Tuple[float, float]]]) -> None:
+        self.body_xy = body_dict_to_array(body)
+
+    face = _points_property("face_xy")
+    right_hand = _points_property("right_hand_xy")
+    left_hand = _points_property("left_hand_xy")
+    right_foot = _points_property("right_foot_xy")
+    left_foot = _points_property("left_foot_xy")
 
     def to_json(self) -> Dict:
         """Converts the Pose object to OpenPose-compatible JSON."""
-        def points_to_flat(points: List[Optional[Tuple[float, float]]]) -> List[float]:
-            return [
-                coord for point in points for coord in (point + (1.0,) if point else (0.0, 0.0, 0.0))
-            ]
-
         return {
-            "pose_keypoints_2d": [
-                coord
-                for key in self.body.keys() if self.body[key] is not None
-                for coord in (self.body[key] + (1.0,))
-            ],
-            "face_keypoints_2d": points_to_flat(self.face),
-            "hand_right_keypoints_2d": points_to_flat(self.right_hand),
-            "hand_left_keypoints_2d": points_to_flat(self.left_hand),
-            "foot_right_keypoints_2d": points_to_flat(self.right_foot),
-            "foot_left_keypoints_2d": points_to_flat(self.left_foot)
+            "pose_keypoints_2d": _flat_keypoints(self.body_xy),
+            "face_keypoints_2d": _flat_keypoints(self.face_xy),
+            "hand_right_keypoints_2d": _flat_keypoints(self.right_hand_xy),
+            "hand_left_keypoints_2d": _flat_keypoints(self.left_hand_xy),
+            "foot_right_keypoints_2d": _flat_keypoints(self.right_foot_xy),
+            "foot_left_keypoints_2d": _flat_keypoints(self.left_foot_xy)
         }
 
     @classmethod
@@ -69,28 +326,23 @@ class Pose:
         if not isinstance(data, dict) or "pose_keypoints_2d" not in data:
             raise ValueError("Invalid OpenPose JSON structure.")
 
-        def flat_to_points(flat_list: List[float], points_per_part: int) -> List[Optional[Tuple[float, float]]]:
-            return [
-                (flat_list[i], flat_list[i + 1]) if flat_list[i + 2] > 0.0 else None
-                for i in range(0, len(flat_list), 3)
-            ]
+        def flat_to_array(flat_list: List[float]) -> np.ndarray:
+            """Reshapes [x, y, c, ...] to (N, 2) points, with NaN where the confidence is not positive."""
+            keypoints = np.asarray(flat_list, dtype=float).reshape(-1, 3)
+            return np.where(keypoints[:, 2:] > 0.0, keypoints[:, :2], np.nan)
+
+        # Rows beyond the 18 COCO joints are ignored, missing rows are missing joints
+        body_xy = np.full((len(JOINT_INDEX), 2), np.nan)
+        body_rows = flat_to_array(data["pose_keypoints_2d"])[:len(JOINT_INDEX)]
+        body_xy[:len(body_rows)] = body_rows
 
         return cls(
-            body={
-                key: (data["pose_keypoints_2d"][i * 3], data["pose_keypoints_2d"][i * 3 + 1])
-                for i, key in enumerate([
-                    "Nose", "Neck", "RShoulder", "RElbow", "RWrist",
-                    "LShoulder", "LElbow", "LWrist", "RHip", "RKnee",
-                    "RAnkle", "LHip", "LKnee", "LAnkle", "REye",
-                    "LEye", "REar", "LEar"
-                ])
-                if data["pose_keypoints_2d"][i * 3 + 2] > 0.0
-            },
-            face=flat_to_points(data.get("face_keypoints_2d", []), 70),
-            right_hand=flat_to_points(data.get("hand_right_keypoints_2d", []), 21),
-            left_hand=flat_to_points(data.get("hand_left_keypoints_2d", []), 21),
-            right_foot=flat_to_points(data.get("foot_right_keypoints_2d", []), 21),
-            left_foot=flat_to_points(data.get("foot_left_keypoints_2d", []), 21),
+            body_xy=body_xy,
+            face_xy=flat_to_array(data.get("face_keypoints_2d", [])),
+            right_hand_xy=flat_to_array(data.get("hand_right_keypoints_2d", [])),
+            left_hand_xy=flat_to_array(data.get("hand_left_keypoints_2d", [])),
+            right_foot_xy=flat_to_array(data.get("foot_right_keypoints_2d", [])),
+            left_foot_xy=flat_to_array(data.get("foot_left_keypoints_2d", [])),
             canvas_width=canvas_width,
             canvas_height=canvas_height
         )
@@ -106,13 +358,20 @@ class Pose:
         if self.input_gender:
             return self.input_gender
 
+        guess_cache = self._body_guess_cache()
+        if "gender" not in guess_cache:
+            guess_cache["gender"] = self._gender_from_proportions()
+        return guess_cache["gender"]
+
+    def _gender_from_proportions(self) -> Optional[str]:
+        """Leg-to-torso heuristic behind guess_gender; None if the body lacks the required joints."""
         def calculate_distance(p1, p2):
             """Helper function to calculate the Euclidean distance between two points."""
-            return np.hypot(p2[0] - p1[0], p2[1] - p1[1])
+            return hypot(p2[0] - p1[0], p2[1] - p1[1])
 
         body = self.body
 
-        if all(k in body for k in ["Neck", "RHip", "RKnee", "RAnkle"]):
+        if _REQUIRED_GENDER_KEYS.issubset(body):
             torso_length = calculate_distance(body["Neck"], body["RHip"])
             leg_length = calculate_distance(body["RHip"], body["RKnee"]) + \
                         calculate_distance(body["RKnee"], body["RAnkle"])
@@ -132,20 +391,40 @@ class Pose:
         Returns:
             Optional[int]: Estimated age in years or None if estimation is not possible.
         """
+        # The ratio only depends on the body, so it is measured once and reused across calls
+        guess_cache = self._body_guess_cache()
+        if "torso_to_head_ratio" not in guess_cache:
+            guess_cache["torso_to_head_ratio"] = self._torso_to_head_ratio()
+        torso_to_head_ratio = guess_cache["torso_to_head_ratio"]
+        if torso_to_head_ratio is None:
+            return None
+
+        # Reference gender for age scaling
+        reference_gender = self.guess_gender() or "female"
+
+        # Find the closest matching age in the predefined ratio table
+        ratios = _age_ratio_table(reference_gender)
+        best_match = int(np.argmin(np.abs(ratios - torso_to_head_ratio)))
+
+        logging.info(f"Estimated age: {best_match} (Torso-to-Head Ratio: {torso_to_head_ratio:.3f})")
+        return best_match
+
+    def _torso_to_head_ratio(self) -> Optional[float]:
+        """Measures the torso-to-head ratio used by guess_age; None if a required joint is missing."""
         def calculate_distance(p1, p2):
             """Helper function to calculate the Euclidean distance between two points."""
-            return np.hypot(p2[0] - p1[0], p2[1] - p1[1])
+            return hypot(p2[0] - p1[0], p2[1] - p1[1])
 
         # Extract torso and head measurements
         body = self.body
 
-        if "Neck" in body and "Nose" in body:
+        if _REQUIRED_HEAD_KEYS.issubset(body):
             head_length = calculate_distance(body["Neck"], body["Nose"])
         else:
             logging.warning("Head length cannot be measured; missing 'Neck' or 'Nose'.")
             return None
 
-        if "Neck" in body and "RHip" in body and "LHip" in body:
+        if _REQUIRED_TORSO_KEYS.issubset(body):
             torso_length = calculate_distance(body["Neck"], body["RHip"]) / 2 + \
                         calculate_distance(body["Neck"], body["LHip"]) / 2
         else:
@@ -153,28 +432,7 @@ class Pose:
             return None
 
         # Calculate the torso-to-head ratio
-        torso_to_head_ratio = torso_length / head_length
-
-        # Reference gender for age scaling
-        reference_gender = self.guess_gender() or "female"
-
-        # Use get_scaling_factors to retrieve predefined ratios
-        age_to_ratios = {}
-        for age in range(0, 21):  # Predefined ages from 0 to 20
-            scaling_factors = get_scaling_factors(age, reference_gender)
-            age_to_ratios[age] = scaling_factors["torso_ratio"] / scaling_factors["head_ratio"]
-
-        # Find the closest matching age
-        best_match = None
-        min_difference = float("inf")
-        for age, ratio in age_to_ratios.items():
-            difference = abs(torso_to_head_ratio - ratio)
-            if difference < min_difference:
-                min_difference = difference
-                best_match = age
-
-        logging.info(f"Estimated age: {best_match} (Torso-to-Head Ratio: {torso_to_head_ratio:.3f})")
-        return best_match
+        return torso_length / head_length
 
     def estimate_height(self) -> Optional[float]:
         """
@@ -231,102 +489,171 @@ class Pose:
         target_height = get_height_by_age_gender(target_age, target_gender)
         height_ratio = target_height / input_height if input_height > 0 else 1.0
 
-        # Detect anchor point
-        anchor = choose_main_support_with_gravity(dict_to_keypoints_array(self.body))
-
-        # Flatten connections into a list of edges
-        edges = [(start, end) for start, connections_list in connections.items() for end in connections_list]
-
-        # Initialize scaled keypoints with the anchor point
-        scaled_keypoints = {anchor: np.array(self.body[anchor])}
-        visited = set([anchor])  # Track visited keypoints to prevent redundant calculations
-        queue = [anchor]  # Initialize queue for BFS traversal
-
-        # Process edges in a breadth-first manner
-        while queue:
-            current = queue.pop(0)  # Get the current keypoint
-            for connection in connections.get(current, []):
-                if connection not in visited and connection in self.body:
-                    # Calculate the scaled position for the connection
-                    start_pos = scaled_keypoints[current]
-                    end_pos = np.array(self.body[connection])
-                    vector = end_pos - np.array(self.body[current])
-                    norm = np.linalg.norm(vector)
-
-                    if norm > 1e-6:
-                        direction = vector / norm
-                        edge_factor = get_edge_factor(current, connection, adjusted_scaling_factors)
-                        scaled_length = norm * edge_factor * height_ratio
-                        scaled_vector = direction * scaled_length
-
-                        # Store the scaled position
-                        scaled_keypoints[connection] = tuple(float(coord) for coord in (start_pos + scaled_vector))
-                        visited.add(connection)
-                        queue.append(connection)
-
-        new_face = scale_face(self.face, adjusted_scaling_factors, height_ratio, scaled_keypoints, self.body)
-
-        # Scale and align left hand
-        new_left_hand = scale_and_align_points(
-            self.left_hand,
-            adjusted_scaling_factors["hand_ratio"] * height_ratio,
-            scaled_keypoints.get("LWrist"),
-            self.body.get("LWrist"),
-        )
+        # Detect anchor point straight from the keypoint array, without a dict round trip
+        anchor = choose_main_support_with_gravity(xy_to_keypoints_array(self.body_xy))
 
-        # Scale and align right hand
-        new_right_hand = scale_and_align_points(
-            self.right_hand,
-            adjusted_scaling_factors["hand_ratio"] * height_ratio,
-            scaled_keypoints.get("RWrist"),
-            self.body.get("RWrist"),
-        )
+        # Same proportions and height (e.g. re-serializing at the input age/gender): nothing moves,
+        # so skip the transforms and only drop the unreachable joints and apply the canvas crop
+        if abs(height_ratio - 1.0) < 1e-9 and all(abs(v - 1.0) < 1e-9 for v in adjusted_scaling_factors.values()):
+            return self._unscaled_pose(anchor, target_gender, target_age)
+
+        # Scale every edge away from the anchor
+        edge_factors = np.array([adjusted_scaling_factors[key] for key in EDGE_RATIO_KEYS])
+        scaled = _bfs_scale(self.body_xy, anchor, edge_factors, height_ratio)
+
+        return self._scale_parts(scaled, adjusted_scaling_factors, height_ratio, target_gender, target_age)
+
+    def scale_to_ages(self, target_gender: str, target_ages: List[int]) -> List["Pose"]:
+        """
+        Scales the pose to several target ages at once; the same as calling scale() once per age.
+
+        Parameters:
+            target_gender (str): The target gender for all scaled poses.
+            target_ages (List[int]): The target ages, one scaled pose per age.
+
+        Returns:
+            List[Pose]: The scaled poses, in the order of `target_ages`.
+        """
+        return self.scale_with_context(precompute_scaling_context(target_gender, target_ages))
+
+    def scale_with_context(self, context: ScalingContext, age_indices: Optional[List[int]] = None) -> List["Pose"]:
+        """
+        Scales the pose to the targets of a precomputed ScalingContext, which can be shared by many poses.
+
+        The input age, gender, proportions and anchor are worked out once, and the body skeletons of
+        all ages are rebuilt in one batched pass.
+
+        Parameters:
+            context (ScalingContext): Targets from precompute_scaling_context.
+            age_indices (Optional[List[int]]): Indices into context.ages to scale to; all ages when None.
 
-        # Scale and align left foot
-        new_left_foot = scale_and_align_points(
-            self.left_foot,
-            adjusted_scaling_factors["foot_ratio"] * height_ratio,
-            scaled_keypoints.get("LAnkle"),
-            self.body.get("LAnkle"),
+        Returns:
+            List[Pose]: The scaled poses, one per selected age in order.
+        """
+        if age_indices is None:
+            age_indices = range(len(context.ages))
+        age_indices = np.asarray(age_indices, dtype=np.intp)
+        target_gender = context.gender
+        target_ages = [context.ages[i] for i in age_indices.tolist()]
+
+        input_age = self.input_age or self.guess_age()
+        input_gender = self.input_gender or self.guess_gender()
+
+        input_scaling_factors = get_scaling_factors(input_age, input_gender)
+        adjusted = context.factors[age_indices] / np.array([input_scaling_factors[key] for key in SCALING_KEYS])
+
+        input_height = get_height_by_age_gender(input_age, input_gender)
+        target_heights = context.heights[age_indices]
+        height_ratios = target_heights / input_height if input_height > 0 else np.ones(len(target_ages))
+
+        # Ages whose proportions and height match the input only get the canvas crop, as in scale()
+        unscaled = (np.abs(height_ratios - 1.0) < 1e-9) & np.all(np.abs(adjusted - 1.0) < 1e-9, axis=1)
+        anchor = choose_main_support_with_gravity(xy_to_keypoints_array(self.body_xy))
+        scaled = None
+        if not unscaled.all():
+            scaled = _bfs_scale(self.body_xy, anchor, adjusted[:, EDGE_RATIO_COLUMNS], height_ratios)
+
+        poses = []
+        for i, target_age in enumerate(target_ages):
+            if unscaled[i]:
+                poses.append(self._unscaled_pose(anchor, target_gender, target_age))
+            else:
+                adjusted_scaling_factors = dict(zip(SCALING_KEYS, adjusted[i].tolist()))
+                poses.append(self._scale_parts(
+                    scaled[i], adjusted_scaling_factors, float(height_ratios[i]), target_gender, target_age
+                ))
+        return poses
+
+    def _unscaled_pose(self, anchor: Optional[str], target_gender: str, target_age: int) -> "Pose":
+        """
+        Copy of the pose, cropped to the canvas, for a target that changes neither proportions nor height.
+
+        Joints the BFS from `anchor` cannot reach are dropped, exactly as _bfs_scale drops them.
+        """
+        body_xy = self.body_xy.copy()
+        if anchor is not None:
+            body_xy[_unreachable_joints(body_xy, anchor)] = np.nan
+        return self._scaled_pose(
+            crop_to_canvas(body_xy, self.canvas_width, self.canvas_height),
+            [crop_to_canvas(part.copy(), self.canvas_width, self.canvas_height) for part in (
+                self.face_xy, self.left_hand_xy, self.right_hand_xy, self.left_foot_xy, self.right_foot_xy
+            )],
+            target_gender, target_age,
         )
 
-        # Scale and align right foot
-        new_right_foot = scale_and_align_points(
-            self.right_foot,
-            adjusted_scaling_factors["foot_ratio"] * height_ratio,
-            scaled_keypoints.get("RAnkle"),
-            self.body.get("RAnkle"),
+    def _scale_parts(
+        self,
+        scaled: np.ndarray,
+        adjusted_scaling_factors: Dict[str, float],
+        height_ratio: float,
+        target_gender: str,
+        target_age: int,
+    ) -> "Pose":
+        """Scales the face, hands and feet onto the scaled (18, 2) body and wraps everything in a new Pose."""
+        parts = (self.face_xy, self.left_hand_xy, self.right_hand_xy, self.left_foot_xy, self.right_foot_xy)
+        offsets = np.cumsum([len(part) for part in parts])
+
+        # Face, hands and feet are moved together as one (K, 2) array in a single affine pass, each
+        # point with its own base and factor; rows left at zero bases and factor one stay put
+        points_xy = np.concatenate(parts).astype(float)
+        scaled_bases = np.zeros_like(points_xy)
+        original_bases = np.zeros_like(points_xy)
+        factors = np.ones(len(points_xy))
+
+        face = slice(0, offsets[0])
+        scaled_bases[face], original_bases[face], factors[face] = face_scaling_params(
+            self.face_xy, adjusted_scaling_factors, height_ratio, scaled, self.body_xy
         )
 
-        # Crop to canvas
-        def crop_point(point):
-            if 0 <= point[0] <= self.canvas_width and 0 <= point[1] <= self.canvas_height:
-                return point
-            else:
-                return None
+        # Hands and feet are aligned on their wrist/ankle
+        for start, end, (joint, ratio_key) in zip(offsets[:-1], offsets[1:], EXTREMITY_BASES):
+            scaled_base, original_base = scaled[joint], self.body_xy[joint]
+            if start == end or np.isnan(scaled_base).any() or np.isnan(original_base).any():
+                logging.warning("Skipping scaling: invalid base keypoint or empty points.")
+                continue
+            scaled_bases[start:end] = scaled_base
+            original_bases[start:end] = original_base
+            factors[start:end] = adjusted_scaling_factors[ratio_key] * height_ratio
+
+        # Points outside [0, W] x [0, H] are dropped
+        width, height = self.canvas_width, self.canvas_height
+        crop_to_canvas(affine_scale_inplace(points_xy, factors[:, None], scaled_bases, original_bases), width, height)
+
+        new_parts = np.split(points_xy, offsets[:-1])
+        return self._scaled_pose(crop_to_canvas(scaled, width, height), new_parts, target_gender, target_age)
+
+    def _scaled_pose(
+        self,
+        body_xy: np.ndarray,
+        parts: List[np.ndarray],
+        target_gender: str,
+        target_age: int,
+    ) -> "Pose":
+        """
+        Wraps already scaled and cropped keypoint arrays in a new Pose on the same canvas.
 
-        for key in scaled_keypoints:
-            if scaled_keypoints[key] is not None:
-                scaled_keypoints[key] = crop_point(scaled_keypoints[key])
+        Parameters:
+            body_xy (np.ndarray): (18, 2) body joints, NaN for missing ones.
+            parts (List[np.ndarray]): Face, left hand, right hand, left foot and right foot points as
+                                      (N, 2) arrays, in that order.
+            target_gender (str): Gender recorded on the new pose.
+            target_age (int): Age recorded on the new pose.
 
-        new_face = [crop_point(p) if p is not None else None for p in new_face]
-        new_left_hand = [crop_point(p) if p is not None else None for p in new_left_hand]
-        new_right_hand = [crop_point(p) if p is not None else None for p in new_right_hand]
-        new_left_foot = [crop_point(p) if p is not None else None for p in new_left_foot]
-        new_right_foot = [crop_point(p) if p is not None else None for p in new_right_foot]
+        Returns:
+            Pose: A new Pose on the same canvas.
+        """
+        new_face, new_left_hand, new_right_hand, new_left_foot, new_right_foot = parts
 
         # Return new scaled pose
         return Pose(
-            body=scaled_keypoints,
-            face=new_face,
-            left_hand=new_left_hand,
-            right_hand=new_right_hand,
-            left_foot=new_left_foot,
-            right_foot=new_right_foot,
+            body_xy=body_xy,
+            face_xy=new_face,
+            left_hand_xy=new_left_hand,
+            right_hand_xy=new_right_hand,
+            left_foot_xy=new_left_foot,
+            right_foot_xy=new_right_foot,
             canvas_width=self.canvas_width,
             canvas_height=self.canvas_height,
             input_age=target_age,
             input_gender=target_gender
         )
-
-    
\ No newline at end of file
@@ -107,19 +107,31 @@ COCO_KEYPOINTS_ORDER = [
     "REye", "LEye", "REar", "LEar"
 ]
 
+NAME_TO_IDX = {name: i for i, name in enumerate(COCO_KEYPOINTS_ORDER)}
+
 def dict_to_keypoints_array(keypoint_dict, default_conf=0.9):
     """
     Convert a dictionary of {keypoint_name: (x,y)} to a numpy array (18,3).
     Missing keypoints get confidence 0.0.
     """
     keypoints_array = np.zeros((18,3), dtype=float)
-    for i, name in enumerate(COCO_KEYPOINTS_ORDER):
-        if name in keypoint_dict:
-            x, y = keypoint_dict[name]
-            keypoints_array[i] = [x, y, default_conf]
-        else:
-            # Missing keypoint
-            keypoints_array[i] = [0.0, 0.0, 0.0]
+    names = [name for name in keypoint_dict if name in NAME_TO_IDX]
+    if names:
+        # Scatter all present keypoints in one assignment
+        idxs = [NAME_TO_IDX[name] for name in names]
+        keypoints_array[idxs, :2] = [keypoint_dict[name] for name in names]
+        keypoints_array[idxs, 2] = default_conf
+    return keypoints_array
+
+def xy_to_keypoints_array(keypoints_xy, default_conf=0.9):
+    """
+    Convert an (18,2) array of (x,y) in COCO order, NaN for missing keypoints, to a numpy array (18,3).
+    Missing keypoints get confidence 0.0.
+    """
+    visible = ~np.isnan(keypoints_xy).any(axis=1)
+    keypoints_array = np.zeros((18,3), dtype=float)
+    keypoints_array[visible, :2] = keypoints_xy[visible]
+    keypoints_array[visible, 2] = default_conf
     return keypoints_array
 
 def estimate_midhip(keypoints, conf_thresh=0.1):
@@ -130,93 +142,171 @@ def estimate_midhip(keypoints, conf_thresh=0.1):
         return midhip_x, midhip_y
     return None, None
 
+# Keypoints behind each part of the COM estimate
+TORSO_IDX = np.array([1, 2, 5])         # Neck, RShoulder, LShoulder
+HIP_IDX = np.array([8, 11])             # RHip, LHip
+
+# Mass ratios of the COM estimate; the arms are lumped into the torso position but kept in the total
+TORSO_MASS = 0.5
+RLEG_MASS = 0.2
+LLEG_MASS = 0.2
+ARMS_MASS = 0.1
+TOTAL_MASS = TORSO_MASS + RLEG_MASS + LLEG_MASS + ARMS_MASS
+
+# (hip, ankle, mass) of the right and left leg: RHip=8, RAnkle=10; LHip=11, LAnkle=13
+LEGS = ((8, 10, RLEG_MASS), (11, 13, LLEG_MASS))
+
+def _com_weights(visible):
+    """
+    The COM is a fixed linear combination of the visible keypoints. Returns its weight per keypoint
+    for a (..., 18) visibility mask, and whether any torso point was visible.
+    """
+    # Torso points: visible Neck/shoulders, plus the mid-hip when both hips are visible
+    torso_visible = visible[..., TORSO_IDX]
+    has_midhip = visible[..., HIP_IDX].all(axis=-1)
+    n_torso = torso_visible.sum(axis=-1) + has_midhip
+    share = 1.0 / np.maximum(n_torso, 1)
+
+    # Torso center: mean of the torso points, the mid-hip splitting its share between both hips
+    torso_weights = np.zeros(visible.shape)
+    torso_weights[..., TORSO_IDX] = torso_visible * share[..., None]
+    torso_weights[..., HIP_IDX] += (has_midhip * share * 0.5)[..., None]
+    weights = TORSO_MASS * torso_weights
+
+    # Leg centers: hip/ankle midpoint, the hip alone, or the torso center, depending on what is visible
+    for hip, ankle, leg_mass in LEGS:
+        hip_visible = visible[..., hip]
+        both_visible = hip_visible & visible[..., ankle]
+        weights[..., hip] += np.where(both_visible, leg_mass / 2.0, hip_visible * leg_mass)
+        weights[..., ankle] += both_visible * (leg_mass / 2.0)
+        weights += (~hip_visible * leg_mass)[..., None] * torso_weights
+
+    return weights / TOTAL_MASS, n_torso > 0
+
 def estimate_COM(keypoints, conf_thresh=0.1):
-    midhip_x, midhip_y = estimate_midhip(keypoints, conf_thresh)
-
-    # Torso points: Neck(1), RShoulder(2), LShoulder(5)
-    torso_indices = [1, 2, 5]
-    torso_points = []
-    for idx in torso_indices:
-        if keypoints[idx,2] > conf_thresh:
-            torso_points.append((keypoints[idx,0], keypoints[idx,1]))
-    if midhip_x is not None:
-        torso_points.append((midhip_x, midhip_y))
-
-    if len(torso_points) == 0:
+    visible = keypoints[:, 2] > conf_thresh
+    weights, has_torso = _com_weights(visible)
+
+    if not has_torso:
         # fallback if no torso points: use any visible point or return mean
-        visible = keypoints[keypoints[:,2]>conf_thresh]
-        if len(visible) == 0:
-            return np.mean(keypoints[:,0]), np.mean(keypoints[:,1])
-        return np.mean(visible[:,0]), np.mean(visible[:,1])
-
-    torso_center_x = np.mean([p[0] for p in torso_points])
-    torso_center_y = np.mean([p[1] for p in torso_points])
-
-    def leg_center(hip_idx, ankle_idx):
-        if keypoints[hip_idx,2]>conf_thresh and keypoints[ankle_idx,2]>conf_thresh:
-            return ((keypoints[hip_idx,0] + keypoints[ankle_idx,0]) / 2.0,
-                    (keypoints[hip_idx,1] + keypoints[ankle_idx,1]) / 2.0)
-        elif keypoints[hip_idx,2]>conf_thresh:
-            return (keypoints[hip_idx,0], keypoints[hip_idx,1])
-        else:
-            return (torso_center_x, torso_center_y)
-
-    # RHip=8, RAnkle=10; LHip=11, LAnkle=13
-    rleg_x, rleg_y = leg_center(8, 10)
-    lleg_x, lleg_y = leg_center(11, 13)
-
-    torso_mass = 0.5
-    rleg_mass = 0.2
-    lleg_mass = 0.2
-    arms_mass = 0.1
-    total_mass = torso_mass + rleg_mass + lleg_mass + arms_mass
-
-    COM_x = (torso_center_x*torso_mass + rleg_x*rleg_mass + lleg_x*lleg_mass) / total_mass
-    COM_y = (torso_center_y*torso_mass + rleg_y*rleg_mass + lleg_y*lleg_mass) / total_mass
+        fallback_points = keypoints[visible, :2] if visible.any() else keypoints[:, :2]
+        COM_x, COM_y = fallback_points.mean(axis=0)
+        return COM_x, COM_y
+
+    COM_x, COM_y = keypoints[:, :2].T @ weights
 
     return COM_x, COM_y
 
-def choose_main_support_with_gravity(keypoints, confidence_threshold=0.1, vertical_tolerance=5.0):
+# Candidate support groups, in priority order
+SUPPORT_GROUPS = (
+    np.array([10, 13]),   # ankles: RAnkle=10, LAnkle=13
+    np.array([9, 12]),    # knees: RKnee=9,  LKnee=12
+    np.array([8, 11]),    # hips:  RHip=8,   LHip=11
+    np.array([1]),        # neck:  Neck=1
+)
+
+# Visibility as an 18-bit mask (bit i = COCO keypoint i), so empty groups are skipped with one AND
+JOINT_BITS = 1 << np.arange(len(COCO_KEYPOINTS_ORDER), dtype=np.int64)
+SUPPORT_GROUP_MASKS = tuple(int(JOINT_BITS[group].sum()) for group in SUPPORT_GROUPS)
+
+# The index arrays are shared by every call; make accidental in-place edits fail loudly
+for _index_array in (TORSO_IDX, HIP_IDX, JOINT_BITS) + SUPPORT_GROUPS:
+    _index_array.setflags(write=False)
+del _index_array
+
+def pose_extent(keypoints, confidence_threshold=0.1):
     """
-    Choose a main support point from {Ankles, Knees, Hips, Neck} only if they are visible.
-    If they are not in the original dictionary, they have 0 confidence and won't be chosen.
+    Larger side of the bounding box of the visible keypoints, for (18,3) or (N,18,3) input.
+    Frames without visible keypoints get 1.0.
     """
-    keypoints = np.asarray(keypoints)
-    COM_x, COM_y = estimate_COM(keypoints, confidence_threshold)
-
-    # Candidate groups in priority
-    groups = [
-        [10, 13],   # ankles: RAnkle=10, LAnkle=13
-        [9, 12],    # knees: RKnee=9,  LKnee=12
-        [8, 11],    # hips:  RHip=8,   LHip=11
-        [1]         # neck:  Neck=1
-    ]
-
-    for group in groups:
-        visible_points = [(idx, keypoints[idx,0], keypoints[idx,1]) 
-                          for idx in group if keypoints[idx,2] > confidence_threshold]
-        
-        if len(visible_points) == 0:
+    visible = (keypoints[..., 2] > confidence_threshold)[..., None]
+    xy = keypoints[..., :2]
+    extent = (np.where(visible, xy, -np.inf).max(axis=-2) - np.where(visible, xy, np.inf).min(axis=-2)).max(axis=-1)
+    return np.where(visible.any(axis=(-2, -1)), extent, 1.0)
+
+def choose_main_support_index(keypoints, confidence_threshold=0.1, vertical_tolerance=5.0, vertical_tolerance_frac=None):
+    """
+    Index-returning core of choose_main_support_with_gravity: the COCO index of the chosen
+    support joint, or None. The COM is only estimated when a group has several candidates.
+    `keypoints` must already be an (18,3) float ndarray; it is used as-is, without conversion.
+    """
+    if vertical_tolerance_frac is not None:
+        # Resolution independent tolerance: a fraction of the pose size instead of fixed pixels
+        vertical_tolerance = vertical_tolerance_frac * float(pose_extent(keypoints, confidence_threshold))
+
+    visible_bits = int(JOINT_BITS[keypoints[:, 2] > confidence_threshold].sum())
+    for group, group_mask in zip(SUPPORT_GROUPS, SUPPORT_GROUP_MASKS):
+        if not visible_bits & group_mask:
             continue
 
-        # Sort by y descending to get lowest points first
-        visible_points.sort(key=lambda p: p[2], reverse=True)
-        top_y = visible_points[0][2]
-        # Consider all points at roughly the same vertical level
-        candidates = [p for p in visible_points if abs(p[2] - top_y) <= vertical_tolerance]
+        # Consider all visible points at roughly the same vertical level as the lowest one
+        visible = keypoints[group, 2] > confidence_threshold
+        ys = keypoints[group, 1]
+        candidates = visible & (np.abs(ys - ys[visible].max()) <= vertical_tolerance)
 
-        if len(candidates) == 1:
-            chosen = candidates[0]
-        else:
-            # Pick the one closest to COM_x
-            candidates.sort(key=lambda p: abs(p[1] - COM_x))
-            chosen = candidates[0]
+        if candidates.sum() == 1:
+            return int(group[candidates.argmax()])
 
-        return COCO_KEYPOINT_NAMES[chosen[0]]
+        # Pick the one closest to COM_x; on equal distance the lower point wins, then group order
+        COM_x, COM_y = estimate_COM(keypoints, confidence_threshold)
+        dx = np.where(candidates, np.abs(keypoints[group, 0] - COM_x), np.inf)
+        closest = dx == dx.min()
+        return int(group[np.argmax(np.where(closest, ys, -np.inf))])
 
     # If none found:
     return None
 
+def choose_main_support_with_gravity(keypoints, confidence_threshold=0.1, vertical_tolerance=5.0, vertical_tolerance_frac=None):
+    """
+    Choose a main support point from {Ankles, Knees, Hips, Neck} only if they are visible.
+    If they are not in the original dictionary, they have 0 confidence and won't be chosen.
+    Joints count as level when their y differs by at most `vertical_tolerance` pixels; pass
+    `vertical_tolerance_frac` (e.g. 0.005) to use that fraction of the pose's bounding box instead,
+    which behaves the same at any image resolution.
+    """
+    # Arrays, the per-frame case, go straight through; only lists and tuples are converted
+    if not isinstance(keypoints, np.ndarray):
+        keypoints = np.asarray(keypoints, dtype=float)
+    index = choose_main_support_index(keypoints, confidence_threshold, vertical_tolerance, vertical_tolerance_frac)
+    return COCO_KEYPOINT_NAMES[index] if index is not None else None
+
+def choose_main_support_with_gravity_batch(keypoints, confidence_threshold=0.1, vertical_tolerance=5.0, vertical_tolerance_frac=None):
+    """
+    Batched choose_main_support_index for an (N,18,3) array of frames.
+    Returns an (N,) int array of COCO keypoint indices, -1 where no support joint is visible.
+    """
+    keypoints = np.asarray(keypoints, dtype=float)
+    if vertical_tolerance_frac is not None:
+        vertical_tolerance = (vertical_tolerance_frac * pose_extent(keypoints, confidence_threshold))[:, None]
+    x, y = keypoints[..., 0], keypoints[..., 1]
+    visible = keypoints[..., 2] > confidence_threshold
+
+    # COM_x of every frame, with the same fallbacks as estimate_COM
+    weights, has_torso = _com_weights(visible)
+    n_visible = visible.sum(axis=1)
+    fallback_x = np.where(n_visible > 0, (x * visible).sum(axis=1) / np.maximum(n_visible, 1), x.mean(axis=1))
+    COM_x = np.where(has_torso, np.einsum('ni,ni->n', x, weights), fallback_x)
+
+    chosen = np.full(len(keypoints), -1)
+    pending = np.ones(len(keypoints), dtype=bool)
+    for group in SUPPORT_GROUPS:
+        group_visible = visible[:, group] & pending[:, None]
+        found = group_visible.any(axis=1)
+
+        # Visible points at roughly the same vertical level as the lowest one, closest to COM_x first;
+        # on equal distance the lower point wins, then group order
+        ys = y[:, group]
+        top_y = np.where(group_visible, ys, -np.inf).max(axis=1, keepdims=True)
+        candidates = group_visible & (np.abs(ys - top_y) <= vertical_tolerance)
+        dx = np.where(candidates, np.abs(x[:, group] - COM_x[:, None]), np.inf)
+        closest = dx == dx.min(axis=1, keepdims=True)
+        best = np.where(closest, ys, -np.inf).argmax(axis=1)
+
+        chosen[found] = group[best[found]]
+        pending &= ~found
+
+    return chosen
+
 """
 # Example scenario:
 # Given dictionary: only torso and upper body joints visible, no ankles/knees detected.
@@ -1,3 +1,5 @@
+import numpy as np
+
 # Height (absolute) data by age and gender
 height = {
     # WHO Child Growth Standards: Length/Height-for-Age (1-5 years)
@@ -32,6 +34,13 @@ head_circumference = {
     }
 }
 
+_head_width_to_height_ratio = {
+    1: 0.85, 2: 0.84, 3: 0.83, 4: 0.83, 5: 0.82,
+    6: 0.82, 7: 0.82, 8: 0.81, 9: 0.81, 10: 0.81,
+    11: 0.80, 12: 0.80, 13: 0.80, 14: 0.79, 15: 0.79,
+    16: 0.79, 17: 0.78, 18: 0.78, 19: 0.78, 20: 0.78
+}
+
 head_width_to_height_ratio = {
     # Head width-to-height ratio data
     # Definition: Ratio of the width of the head to its height, derived from scientific studies of craniofacial growth.
@@ -41,18 +50,9 @@ head_width_to_height_ratio = {
     # Finding: Research indicates minimal sexual dimorphism in head width-to-height ratio across ages. 
     # Source: PLOS ONE study (journals.plos.org): "No significant differences in facial width-to-height ratios between sexes."
     # Link: https://journals.plos.org/plosone/article?id=10.1371%2Fjournal.pone.0042705
-    "male": {
-        1: 0.85, 2: 0.84, 3: 0.83, 4: 0.83, 5: 0.82,
-        6: 0.82, 7: 0.82, 8: 0.81, 9: 0.81, 10: 0.81,
-        11: 0.80, 12: 0.80, 13: 0.80, 14: 0.79, 15: 0.79,
-        16: 0.79, 17: 0.78, 18: 0.78, 19: 0.78, 20: 0.78
-    },
-    "female": {
-        1: 0.85, 2: 0.84, 3: 0.83, 4: 0.83, 5: 0.82,
-        6: 0.82, 7: 0.82, 8: 0.81, 9: 0.81, 10: 0.81,
-        11: 0.80, 12: 0.80, 13: 0.80, 14: 0.79, 15: 0.79,
-        16: 0.79, 17: 0.78, 18: 0.78, 19: 0.78, 20: 0.78
-    }
+    # Both sexes share one age table.
+    "male": _head_width_to_height_ratio,
+    "female": _head_width_to_height_ratio,
 }
 
 
@@ -131,6 +131,13 @@ hand_length_ratio = {
 }
 
 # Absolute eye diameter in millimeters by age
+_eye_diameter_mm = {
+    1: 17.0, 2: 19.0, 3: 20.0, 4: 21.0, 5: 22.0,
+    6: 22.5, 7: 23.0, 8: 23.2, 9: 23.4, 10: 23.6,
+    11: 23.8, 12: 24.0, 13: 24.0, 14: 24.0, 15: 24.0,
+    16: 24.0, 17: 24.0, 18: 24.0, 19: 24.0, 20: 24.0
+}
+
 eye_diameter_mm = {
     # Definitions:
     # - Eye Diameter: Distance across the widest part of the eyeball.
@@ -142,18 +149,9 @@ eye_diameter_mm = {
     # - Eye growth is most significant during the first two years of life.
     # - By age 5, the eye diameter reaches nearly adult size (~22 mm).
     # - Absolute eye size stabilizes at ~24 mm after puberty, with no significant gender difference in adulthood.
-    "female": {
-        1: 17.0, 2: 19.0, 3: 20.0, 4: 21.0, 5: 22.0,
-        6: 22.5, 7: 23.0, 8: 23.2, 9: 23.4, 10: 23.6,
-        11: 23.8, 12: 24.0, 13: 24.0, 14: 24.0, 15: 24.0,
-        16: 24.0, 17: 24.0, 18: 24.0, 19: 24.0, 20: 24.0
-    },
-    "male": {
-        1: 17.0, 2: 19.0, 3: 20.0, 4: 21.0, 5: 22.0,
-        6: 22.5, 7: 23.0, 8: 23.2, 9: 23.4, 10: 23.6,
-        11: 23.8, 12: 24.0, 13: 24.0, 14: 24.0, 15: 24.0,
-        16: 24.0, 17: 24.0, 18: 24.0, 19: 24.0, 20: 24.0
-    }
+    # Both sexes share one age table.
+    "female": _eye_diameter_mm,
+    "male": _eye_diameter_mm,
 }
 
 mouth_factor = {
@@ -357,3 +355,118 @@ nasal_length = {
         21: 45.0, # Assumed stable post-adolescence based on ARC Journals.
     }
 }
+
+
+# Array views of the tables above, indexed [sex_index, age] with ages 0-21.
+# Ages a table has no value for are NaN.
+SEXES = ("female", "male")
+SEX_INDEX = {sex: i for i, sex in enumerate(SEXES)}
+MAX_AGE = 21
+
+def _age_table(table):
+    """Packs a {sex: {age: value}} dict into a (2, MAX_AGE + 1) float32 array, NaN where an age is missing."""
+    array = np.full((len(SEXES), MAX_AGE + 1), np.nan, dtype=np.float32)
+    for sex_index, sex in enumerate(SEXES):
+        for age, value in table[sex].items():
+            array[sex_index, age] = value
+    return array
+
+HEIGHT_TABLE = _age_table(height)
+HEAD_CIRCUMFERENCE_TABLE = _age_table(head_circumference)
+# Tables without a sex difference are stored once; their (2, ages) table is a read-only broadcast view.
+# The 1-D sources are read-only as well, so they cannot drift from the copies stacked into ANTHRO below
+HEAD_WIDTH_TO_HEIGHT_RATIO = _age_table(head_width_to_height_ratio)[0]
+HEAD_WIDTH_TO_HEIGHT_RATIO.flags.writeable = False
+HEAD_WIDTH_TO_HEIGHT_RATIO_TABLE = np.broadcast_to(HEAD_WIDTH_TO_HEIGHT_RATIO, (len(SEXES), MAX_AGE + 1))
+TORSO_RATIO_TABLE = _age_table(torso_ratio)
+ARM_SPAN_RATIO_TABLE = _age_table(arm_span_ratio)
+LEG_LENGTH_RATIO_TABLE = _age_table(leg_length_ratio)
+HAND_LENGTH_RATIO_TABLE = _age_table(hand_length_ratio)
+EYE_DIAMETER_MM = _age_table(eye_diameter_mm)[0]
+EYE_DIAMETER_MM.flags.writeable = False
+EYE_DIAMETER_MM_TABLE = np.broadcast_to(EYE_DIAMETER_MM, (len(SEXES), MAX_AGE + 1))
+MOUTH_FACTOR_TABLE = _age_table(mouth_factor)
+JAW_GROWTH_FACTORS_TABLE = _age_table(jaw_growth_factors)
+JAW_FACTORS_TABLE = _age_table(jaw_factors)
+SHOULDER_BREADTH_TABLE = _age_table(shoulder_breadth)
+HIP_WIDTH_TABLE = _age_table(hip_width)
+NASAL_LENGTH_TABLE = _age_table(nasal_length)
+
+def table_lookup(table, sex, age):
+    """
+    Looks up one value of an age table, e.g. table_lookup(HEIGHT_TABLE, "male", 12).
+    Returns NaN for ages the underlying data does not cover.
+    """
+    return table[SEX_INDEX[sex], age]
+
+def height_lookup(sex, age):
+    """
+    Looks up the height in cm for one sex and integer age, e.g. height_lookup("female", 9).
+    Returns NaN for ages the height data does not cover.
+    """
+    return table_lookup(HEIGHT_TABLE, sex, age)
+
+# Every table stacked into one tensor. ANTHRO[RATIO_INDEX[name], sex_index, age] matches the
+# single tables; the memory is laid out [sex_index, age, property], so all properties of one
+# (sex, age) pair sit next to each other and lookup() reads them as one contiguous vector.
+ANTHRO_TABLES = {
+    "height": HEIGHT_TABLE,
+    "head_circumference": HEAD_CIRCUMFERENCE_TABLE,
+    "head_width_to_height_ratio": HEAD_WIDTH_TO_HEIGHT_RATIO_TABLE,
+    "torso_ratio": TORSO_RATIO_TABLE,
+    "arm_span_ratio": ARM_SPAN_RATIO_TABLE,
+    "leg_length_ratio": LEG_LENGTH_RATIO_TABLE,
+    "hand_length_ratio": HAND_LENGTH_RATIO_TABLE,
+    "eye_diameter_mm": EYE_DIAMETER_MM_TABLE,
+    "mouth_factor": MOUTH_FACTOR_TABLE,
+    "jaw_factors": JAW_FACTORS_TABLE,
+    "shoulder_breadth": SHOULDER_BREADTH_TABLE,
+    "hip_width": HIP_WIDTH_TABLE,
+    "nasal_length": NASAL_LENGTH_TABLE,
+    "jaw_growth_factors": JAW_GROWTH_FACTORS_TABLE,
+}
+RATIO_INDEX = {name: i for i, name in enumerate(ANTHRO_TABLES)}
+_ANTHRO_BY_SEX_AGE = np.ascontiguousarray(np.stack(list(ANTHRO_TABLES.values()), axis=-1))
+ANTHRO = np.moveaxis(_ANTHRO_BY_SEX_AGE, -1, 0)
+
+def lookup(sex_index, age):
+    """
+    All properties of one (sex, age) pair as a float32 vector, ordered like RATIO_INDEX.
+    Properties the data does not cover at that age are NaN.
+    """
+    return _ANTHRO_BY_SEX_AGE[sex_index, age]
+
+# Integer ages of the table columns, for interpolating at fractional ages
+AGE_RANGE = np.arange(MAX_AGE + 1, dtype=np.float32)
+
+def interp_table(table, sex, ages):
+    """
+    Linearly interpolates an age table at any (fractional) ages in one call, e.g.
+    interp_table(HEIGHT_TABLE, "male", np.array([4.5, 7.2, 13.9])).
+    Ages outside the range a table covers take the value at its nearest end.
+    """
+    row = table[SEX_INDEX[sex]]
+    known = ~np.isnan(row)
+    return np.interp(ages, AGE_RANGE[known], row[known])
+
+def interp_height(sex, ages):
+    """
+    Linearly interpolates the height in cm at any (fractional) ages, e.g.
+    interp_height("male", np.array([4.5, 7.2])). Ages outside the data take the nearest end value.
+    """
+    return interp_table(HEIGHT_TABLE, sex, ages)
+
+# The dimensionless ratios and factors have at most 4 significant digits, which float16 holds to within
+# ~5e-4 relative error, so they are also kept as a half-size [sex_index, age, ratio] table. Absolute
+# lengths (height, circumferences, breadths, mm sizes) are not included; they stay float32.
+RATIO_PROPERTIES = (
+    "head_width_to_height_ratio", "torso_ratio", "arm_span_ratio", "leg_length_ratio",
+    "hand_length_ratio", "mouth_factor", "jaw_factors", "jaw_growth_factors",
+)
+RATIOS_FP16 = np.ascontiguousarray(
+    _ANTHRO_BY_SEX_AGE[..., [RATIO_INDEX[name] for name in RATIO_PROPERTIES]], dtype=np.float16
+)
+
+def lookup_ratios(sex_index, age):
+    """The RATIO_PROPERTIES of one (sex, age) pair, upcast to float32 so callers never compute in float16."""
+    return RATIOS_FP16[sex_index, age].astype(np.float32)
@@ -1,7 +1,24 @@
-from typing import Dict, List, Optional, Tuple, Union
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 import logging
 
+from anchor_point import COCO_KEYPOINTS_ORDER
+
+# Row of each body keypoint in (18, 2) body arrays
+BODY_INDEX = {name: i for i, name in enumerate(COCO_KEYPOINTS_ORDER)}
+
+GENDERS = ("female", "male")
+GENDER_INDEX = {gender: i for i, gender in enumerate(GENDERS)}
+
+# WHO-based average heights (cm) for ages 1 to 20, indexed [gender_index, age - 1]
+HEIGHT_BY_AGE = np.array([
+    [74.0, 85.0, 95.0, 100.0, 106.0, 113.0, 118.0, 123.0, 129.0, 135.0,
+     141.0, 148.0, 155.0, 160.0, 163.0, 164.0, 164.0, 165.0, 165.0, 165.0],  # female; adult from 18
+    [75.0, 87.0, 96.0, 102.0, 108.0, 115.0, 120.0, 125.0, 130.0, 137.0,
+     143.0, 149.0, 156.0, 163.0, 169.0, 173.0, 175.0, 176.0, 176.0, 176.0],  # male; adult from 18
+])
+
 def get_height_by_age_gender(age, gender):
     """
     Estimates the height (in cm) based on age and gender using smoothed values.
@@ -13,41 +30,80 @@ def get_height_by_age_gender(age, gender):
     Returns:
         float: Estimated height in cm.
     """
-    # WHO-based average heights for different ages
-    height_data = {
-        "male": {
-            1: 75.0, 2: 87.0, 3: 96.0, 4: 102.0, 5: 108.0, 6: 115.0,
-            7: 120.0, 8: 125.0, 9: 130.0, 10: 137.0, 11: 143.0, 12: 149.0,
-            13: 156.0, 14: 163.0, 15: 169.0, 16: 173.0, 17: 175.0,
-            18: 176.0, 19: 176.0, 20: 176.0,  # Adult height
-        },
-        "female": {
-            1: 74.0, 2: 85.0, 3: 95.0, 4: 100.0, 5: 106.0, 6: 113.0,
-            7: 118.0, 8: 123.0, 9: 129.0, 10: 135.0, 11: 141.0, 12: 148.0,
-            13: 155.0, 14: 160.0, 15: 163.0, 16: 164.0, 17: 164.0,
-            18: 165.0, 19: 165.0, 20: 165.0,  # Adult height
-        },
-    }
-
-    # Ensure the age is within bounds
-    age_data = height_data.get(gender, height_data["female"])
-    
-    # Adult fallback
+    # Unknown genders use the female heights
+    heights = HEIGHT_BY_AGE[GENDER_INDEX.get(gender, 0)]
+
+    # Adult fallback and clamp to the youngest age
     if age >= 20:
-        return age_data[20]  # Return the adult height
+        return float(heights[-1])  # Return the adult height
+    if age < 1:
+        return float(heights[0])
+
+    if age != int(age):
+        raise ValueError("Unexpected age value not covered in height data.")
+    return float(heights[int(age) - 1])
 
-    if age in age_data:
-        return age_data[age]
+def get_heights(ages, gender) -> np.ndarray:
+    """
+    Vectorized get_height_by_age_gender: estimated heights (in cm) for many ages at once.
+
+    Parameters:
+        ages (Iterable[int]): Ages of the persons.
+        gender (str): Gender of the persons ("male" or "female").
+
+    Returns:
+        np.ndarray: Estimated heights in cm, one per age.
+    """
+    ages = np.asarray(ages, dtype=float)
+    # Ages below 1 and from 20 on are clamped; in between only whole ages are covered
+    if (np.isnan(ages) | ((ages >= 1) & (ages < 20) & (ages != np.floor(ages)))).any():
+        raise ValueError("Unexpected age value not covered in height data.")
+    return HEIGHT_BY_AGE[GENDER_INDEX.get(gender, 0), np.clip(ages, 1, 20).astype(np.intp) - 1]
+
+# Which scaling factor each body connection uses; looked up in both directions
+EDGE_TO_RATIO_KEY = {
+    # Head and torso
+    ("Neck", "Nose"): "head_ratio",
+    ("Neck", "RShoulder"): "torso_ratio",
+    ("Neck", "LShoulder"): "torso_ratio",
+    ("Neck", "RHip"): "torso_ratio",
+    ("Neck", "LHip"): "torso_ratio",
+
+    # Arms
+    ("RShoulder", "RElbow"): "arm_ratio",
+    ("RElbow", "RWrist"): "arm_ratio",
+    ("LShoulder", "LElbow"): "arm_ratio",
+    ("LElbow", "LWrist"): "arm_ratio",
+
+    # Legs
+    ("RHip", "RKnee"): "leg_ratio",
+    ("RKnee", "RAnkle"): "leg_ratio",
+    ("LHip", "LKnee"): "leg_ratio",
+    ("LKnee", "LAnkle"): "leg_ratio",
+
+    # Face
+    ("Nose", "REye"): "head_ratio",
+    ("Nose", "LEye"): "head_ratio",
+    ("REye", "REar"): "head_ratio",
+    ("LEye", "LEar"): "head_ratio",
+}
+
+# EDGE_TO_RATIO_KEY keyed by the unordered pair of keypoints
+EDGE_RATIO_KEY_BY_PAIR = {frozenset(edge): ratio_key for edge, ratio_key in EDGE_TO_RATIO_KEY.items()}
+
+def get_edge_ratio_key(start: str, end: str) -> str:
+    """
+    Get the name of the scaling factor used for a connection between two body points.
 
-    # Clamp to min and max ages
-    min_age, max_age = min(age_data.keys()), max(age_data.keys())
-    if age < min_age:
-        return age_data[min_age]
-    elif age > max_age:
-        return age_data[max_age]
+    Parameters:
+        start (str): The starting keypoint (e.g., "Neck").
+        end (str): The ending keypoint (e.g., "Nose").
 
-    # Shouldn't happen due to exhaustive age data
-    raise ValueError("Unexpected age value not covered in height data.")
+    Returns:
+        str: Key into the scaling factors, e.g. "arm_ratio".
+    """
+    # Unordered key for the bidirectional lookup; default to head ratio for unexpected connections
+    return EDGE_RATIO_KEY_BY_PAIR.get(frozenset((start, end)), "head_ratio")
 
 def get_edge_factor(start: str, end: str, scaling_factors: Dict[str, float]) -> float:
     """
@@ -61,47 +117,94 @@ def get_edge_factor(start: str, end: str, scaling_factors: Dict[str, float]) ->
     Returns:
         float: The scaling factor for the connection.
     """
-    # Define a connection-to-ratio mapping
-    connection_map = {
-        # Head and torso
-        ("Neck", "Nose"): scaling_factors["head_ratio"],
-        ("Neck", "RShoulder"): scaling_factors["torso_ratio"],
-        ("Neck", "LShoulder"): scaling_factors["torso_ratio"],
-        ("Neck", "RHip"): scaling_factors["torso_ratio"],
-        ("Neck", "LHip"): scaling_factors["torso_ratio"],
-        
-        # Arms
-        ("RShoulder", "RElbow"): scaling_factors["arm_ratio"],
-        ("RElbow", "RWrist"): scaling_factors["arm_ratio"],
-        ("LShoulder", "LElbow"): scaling_factors["arm_ratio"],
-        ("LElbow", "LWrist"): scaling_factors["arm_ratio"],
-
-        # Legs
-        ("RHip", "RKnee"): scaling_factors["leg_ratio"],
-        ("RKnee", "RAnkle"): scaling_factors["leg_ratio"],
-        ("LHip", "LKnee"): scaling_factors["leg_ratio"],
-        ("LKnee", "LAnkle"): scaling_factors["leg_ratio"],
-
-        # Face
-        ("Nose", "REye"): scaling_factors["head_ratio"],
-        ("Nose", "LEye"): scaling_factors["head_ratio"],
-        ("REye", "REar"): scaling_factors["head_ratio"],
-        ("LEye", "LEar"): scaling_factors["head_ratio"],
-    }
-
-    # Ensure bidirectional lookup
-    if (start, end) in connection_map:
-        return connection_map[(start, end)]
-    if (end, start) in connection_map:
-        return connection_map[(end, start)]
-
-    # Default to head ratio for unexpected connections
-    return scaling_factors["head_ratio"]
+    return scaling_factors[get_edge_ratio_key(start, end)]
 
     
+# Base adult proportions for reference
+BASE_SCALING_FACTORS = {
+    "head_ratio": 0.15, "torso_ratio": 0.36, "arm_ratio": 0.20, "leg_ratio": 0.30,
+    "hand_ratio": 1.0, "foot_ratio": 1.0, "eye_factor": 1.0, "mouth_factor": 1.0,
+    "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.0,
+}
+SCALING_KEYS = tuple(BASE_SCALING_FACTORS)
+
+# Define age ranges for adjustments
+AGE_RANGE_ADJUSTMENTS = [
+    (0, 5, {
+        "head_ratio": 0.25, "torso_ratio": 0.30, "arm_ratio": 0.15, "leg_ratio": 0.30,
+        "hand_ratio": 0.8, "foot_ratio": 0.8, "eye_factor": 1.5, "mouth_factor": 1.2,
+        "jaw_factor": 1.3, "nose_factor": 0.8, "face_contour_factor": 1.4,
+    }),
+    (6, 7, {
+        "head_ratio": 0.23, "torso_ratio": 0.32, "arm_ratio": 0.17, "leg_ratio": 0.29,
+        "hand_ratio": 0.85, "foot_ratio": 0.85, "eye_factor": 1.4, "mouth_factor": 1.1,
+        "jaw_factor": 1.2, "nose_factor": 0.85, "face_contour_factor": 1.3,
+    }),
+    (8, 10, {
+        "head_ratio": 0.21, "torso_ratio": 0.34, "arm_ratio": 0.18, "leg_ratio": 0.28,
+        "hand_ratio": 0.9, "foot_ratio": 0.9, "eye_factor": 1.3, "mouth_factor": 1.1,
+        "jaw_factor": 1.15, "nose_factor": 0.9, "face_contour_factor": 1.2,
+    }),
+    (11, 13, {
+        "head_ratio": 0.19, "torso_ratio": 0.35, "arm_ratio": 0.19, "leg_ratio": 0.27,
+        "hand_ratio": 1.0, "foot_ratio": 1.0, "eye_factor": 1.2, "mouth_factor": 1.1,
+        "jaw_factor": 1.05, "nose_factor": 1.0, "face_contour_factor": 1.1,
+    }),
+    (14, 16, {
+        "head_ratio": 0.17, "torso_ratio": 0.36, "arm_ratio": 0.19, "leg_ratio": 0.28,
+        "hand_ratio": 1.05, "foot_ratio": 1.05, "eye_factor": 1.1, "mouth_factor": 1.1,
+        "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.05,
+    }),
+    (17, 19, {
+        "head_ratio": 0.17, "torso_ratio": 0.36, "arm_ratio": 0.20, "leg_ratio": 0.29,
+        "hand_ratio": 1.1, "foot_ratio": 1.1, "eye_factor": 1.0, "mouth_factor": 1.0,
+        "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.05,
+    }),
+]
+
+def _compute_scaling_factors(age, gender):
+    """Scaling factors of one (age, gender) from the tables above; used to fill SCALING_TABLE."""
+    scaling_factors = dict(BASE_SCALING_FACTORS)
+
+    # Apply adjustments based on age
+    for min_age, max_age, adjustments in AGE_RANGE_ADJUSTMENTS:
+        if min_age <= age <= max_age:
+            scaling_factors.update(adjustments)
+            break
+
+    # Apply gender-based adjustments
+    if gender == "female":
+        scaling_factors["jaw_factor"] *= 0.95  # Softer jawline
+        scaling_factors["mouth_factor"] *= 1.1  # Larger lips
+        scaling_factors["face_contour_factor"] *= 1.05  # Rounder face contour
+
+    return scaling_factors
+
+# Bounds of the AGE_RANGE_ADJUSTMENTS ranges, for np.searchsorted
+AGE_RANGE_MINS = np.array([min_age for min_age, _, _ in AGE_RANGE_ADJUSTMENTS])
+AGE_RANGE_MAXS = np.array([max_age for _, max_age, _ in AGE_RANGE_ADJUSTMENTS])
+# Bucket of the ages outside every range: the adult proportions
+ADULT_BUCKET = len(AGE_RANGE_ADJUSTMENTS)
+
+# Scaling factors precomputed per [gender_index, bucket, SCALING_KEYS]: one bucket per age range,
+# then the adult bucket
+SCALING_TABLE = np.array([
+    [[_compute_scaling_factors(min_age, gender)[key] for key in SCALING_KEYS] for min_age in AGE_RANGE_MINS]
+    + [[_compute_scaling_factors(AGE_RANGE_MAXS[-1] + 1, gender)[key] for key in SCALING_KEYS]]
+    for gender in GENDERS
+])
+
+def age_buckets(ages) -> np.ndarray:
+    """Bucket (row of SCALING_TABLE) of each age; ages between or above the age ranges get ADULT_BUCKET."""
+    ages = np.asarray(ages, dtype=float)
+    # Last range starting at or below the age, kept only if the age does not run past its end
+    bucket = np.searchsorted(AGE_RANGE_MINS, ages, side="right") - 1
+    return np.where(ages <= AGE_RANGE_MAXS[bucket], bucket, ADULT_BUCKET)
+
 def get_scaling_factors(age: int, gender: str = "female") -> Dict[str, float]:
     """
     Returns scaling factors for body and facial proportions based on age and gender.
+    For many ages at once, use get_scaling_factor_matrix.
 
     Parameters:
         age (int): The target age for scaling.
@@ -115,61 +218,206 @@ def get_scaling_factors(age: int, gender: str = "female") -> Dict[str, float]:
     if not (0 <= age <= 120):
         raise ValueError("`age` must be between 0 and 120.")
 
-    # Base adult proportions for reference
-    scaling_factors = {
-        "head_ratio": 0.15, "torso_ratio": 0.36, "arm_ratio": 0.20, "leg_ratio": 0.30,
-        "hand_ratio": 1.0, "foot_ratio": 1.0, "eye_factor": 1.0, "mouth_factor": 1.0,
-        "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.0,
-    }
-
-    # Define age ranges for adjustments
-    age_ranges = [
-        (0, 5, {
-            "head_ratio": 0.25, "torso_ratio": 0.30, "arm_ratio": 0.15, "leg_ratio": 0.30,
-            "hand_ratio": 0.8, "foot_ratio": 0.8, "eye_factor": 1.5, "mouth_factor": 1.2,
-            "jaw_factor": 1.3, "nose_factor": 0.8, "face_contour_factor": 1.4,
-        }),
-        (6, 7, {
-            "head_ratio": 0.23, "torso_ratio": 0.32, "arm_ratio": 0.17, "leg_ratio": 0.29,
-            "hand_ratio": 0.85, "foot_ratio": 0.85, "eye_factor": 1.4, "mouth_factor": 1.1,
-            "jaw_factor": 1.2, "nose_factor": 0.85, "face_contour_factor": 1.3,
-        }),
-        (8, 10, {
-            "head_ratio": 0.21, "torso_ratio": 0.34, "arm_ratio": 0.18, "leg_ratio": 0.28,
-            "hand_ratio": 0.9, "foot_ratio": 0.9, "eye_factor": 1.3, "mouth_factor": 1.1,
-            "jaw_factor": 1.15, "nose_factor": 0.9, "face_contour_factor": 1.2,
-        }),
-        (11, 13, {
-            "head_ratio": 0.19, "torso_ratio": 0.35, "arm_ratio": 0.19, "leg_ratio": 0.27,
-            "hand_ratio": 1.0, "foot_ratio": 1.0, "eye_factor": 1.2, "mouth_factor": 1.1,
-            "jaw_factor": 1.05, "nose_factor": 1.0, "face_contour_factor": 1.1,
-        }),
-        (14, 16, {
-            "head_ratio": 0.17, "torso_ratio": 0.36, "arm_ratio": 0.19, "leg_ratio": 0.28,
-            "hand_ratio": 1.05, "foot_ratio": 1.05, "eye_factor": 1.1, "mouth_factor": 1.1,
-            "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.05,
-        }),
-        (17, 19, {
-            "head_ratio": 0.17, "torso_ratio": 0.36, "arm_ratio": 0.20, "leg_ratio": 0.29,
-            "hand_ratio": 1.1, "foot_ratio": 1.1, "eye_factor": 1.0, "mouth_factor": 1.0,
-            "jaw_factor": 1.0, "nose_factor": 1.0, "face_contour_factor": 1.05,
-        }),
-    ]
+    return dict(zip(SCALING_KEYS, SCALING_TABLE[GENDER_INDEX[gender], age_buckets(age)].tolist()))
 
-    # Apply adjustments based on age
-    for min_age, max_age, adjustments in age_ranges:
-        if min_age <= age <= max_age:
-            scaling_factors.update(adjustments)
-            break
+def get_scaling_factor_matrix(ages, gender: str = "female") -> np.ndarray:
+    """
+    Returns the scaling factors of many target ages at once.
 
-    # Apply gender-based adjustments
-    if gender == "female":
-        scaling_factors["jaw_factor"] *= 0.95  # Softer jawline
-        scaling_factors["mouth_factor"] *= 1.1  # Larger lips
-        scaling_factors["face_contour_factor"] *= 1.05  # Rounder face contour
+    Parameters:
+        ages (Iterable[float]): Target ages, each between 0 and 120.
+        gender (str): The target gender for scaling ("male" or "female").
 
-    return scaling_factors
+    Returns:
+        np.ndarray: (len(ages), len(SCALING_KEYS)) factors, one row per age with columns in SCALING_KEYS order.
+    """
+    if gender not in ["male", "female"]:
+        raise ValueError("`gender` must be either 'male' or 'female'.")
+    ages = np.asarray(ages, dtype=float).reshape(-1)
+    if not ((ages >= 0) & (ages <= 120)).all():
+        raise ValueError("`age` must be between 0 and 120.")
+    return SCALING_TABLE[GENDER_INDEX[gender], age_buckets(ages)]
 
+# Target-side scaling data for one gender and several ages: the (A, len(SCALING_KEYS)) factor
+# matrix and the (A,) heights, shared by every pose scaled to those targets
+ScalingContext = namedtuple("ScalingContext", "gender ages factors heights")
+
+def precompute_scaling_context(target_gender: str, target_ages) -> ScalingContext:
+    """
+    Looks up everything about the scaling targets that does not depend on the input pose, once.
+
+    Parameters:
+        target_gender (str): The target gender for scaling ("male" or "female").
+        target_ages (Iterable[int]): The target ages.
+
+    Returns:
+        ScalingContext: The targets with their factor matrix and heights.
+    """
+    ages = tuple(target_ages)
+    return ScalingContext(
+        target_gender, ages, get_scaling_factor_matrix(ages, target_gender), get_heights(ages, target_gender)
+    )
+
+def affine_scale_inplace(
+    points_xy: np.ndarray, scaling_factor, scaled_base: np.ndarray, original_base: np.ndarray
+) -> np.ndarray:
+    """
+    Moves (N, 2) float points in place to scaled_base + (point - original_base) * scaling_factor.
+    The bases and factor broadcast against the points, so they can be given per point ((N, 2) and
+    (N, 1)) or shared. NaN rows stay NaN. Returns points_xy.
+    """
+    np.subtract(points_xy, original_base, out=points_xy)
+    np.multiply(points_xy, scaling_factor, out=points_xy)
+    np.add(points_xy, scaled_base, out=points_xy)
+    return points_xy
+
+# Mouth points averaged for the mouth center (COCO-WholeBody face layout)
+MOUTH_INDICES = np.arange(48, 68)
+
+# Face point indices of each facial region (COCO-WholeBody face layout)
+REGION_INDICES = {
+    "face_contour": np.array([0, 1, 2, 3, 4, 5, 11, 12, 13, 14, 15, 16]),  # Face contour (0-16 without the jaw)
+    "jaw": np.arange(6, 11),  # Jaw (6-10 inclusive)
+    "right_eyebrow": np.arange(17, 22),  # Right eyebrow (17-21 inclusive)
+    "left_eyebrow": np.arange(22, 27),  # Left eyebrow (22-26 inclusive)
+    "nose": np.arange(27, 36),  # Nose (27-35 inclusive)
+    "right_eye": np.arange(36, 42),  # Right eye (36-41 inclusive)
+    "left_eye": np.arange(42, 48),  # Left eye (42-47 inclusive)
+    "mouth": np.arange(48, 71),  # Mouth (48-70 inclusive)
+}
+
+# (region, indices, base body keypoint, scaling factor key) per facial region; a base of None
+# stands for the mouth center, which is computed per face
+FACE_REGIONS = (
+    ("face_contour", REGION_INDICES["face_contour"], "Nose", "face_contour_factor"),
+    ("jaw", REGION_INDICES["jaw"], "Nose", "jaw_factor"),
+    ("right_eyebrow", REGION_INDICES["right_eyebrow"], "REye", "eye_factor"),
+    ("left_eyebrow", REGION_INDICES["left_eyebrow"], "LEye", "eye_factor"),
+    ("nose", REGION_INDICES["nose"], "Nose", "nose_factor"),
+    ("right_eye", REGION_INDICES["right_eye"], "REye", "eye_factor"),
+    ("left_eye", REGION_INDICES["left_eye"], "LEye", "eye_factor"),
+    ("mouth", REGION_INDICES["mouth"], None, "mouth_factor"),
+)
+
+def calculate_mouth_center(points_xy: np.ndarray) -> Optional[Tuple[float, float]]:
+    """
+    Calculates the center of the mouth as the mean position of the valid mouth points.
+
+    Parameters:
+        points_xy (np.ndarray): (N, 2) facial keypoints, NaN for missing points.
+
+    Returns:
+        Optional[Tuple[float, float]]: Calculated center of the mouth, or None if no valid points.
+    """
+    mouth_xy = points_xy[MOUTH_INDICES[MOUTH_INDICES < len(points_xy)]]
+    if np.isnan(mouth_xy[:, 0]).all():
+        return None
+    cx, cy = np.nanmean(mouth_xy, axis=0)
+    return (float(cx), float(cy))
+
+def face_scaling_params(
+    face_xy: np.ndarray,
+    scaling_factors: dict,
+    height_ratio: float,
+    scaled_body_xy: np.ndarray,
+    original_body_xy: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Works out how every facial keypoint moves: scaled_base + (point - original_base) * factor, with the
+    base and factor (height_ratio included) of its region. Points of regions without a usable base
+    get zero bases and a factor of one, so they stay put.
+
+    Parameters:
+        face_xy (np.ndarray): (N, 2) original facial keypoints, NaN for missing points.
+        scaling_factors (dict): Scaling factors for different facial regions.
+        height_ratio (float): Ratio of target height to input height.
+        scaled_body_xy (np.ndarray): (18, 2) scaled body keypoints in COCO order, NaN for missing joints.
+        original_body_xy (np.ndarray): (18, 2) original body keypoints in COCO order, NaN for missing joints.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (N, 2) scaled bases, (N, 2) original bases and (N,) factors.
+    """
+    num_points = len(face_xy)
+    scaled_bases = np.zeros((num_points, 2))
+    original_bases = np.zeros((num_points, 2))
+    factors = np.ones(num_points)
+
+    if num_points == 0 or np.isnan(face_xy[:, 0]).all():
+        logging.warning("No face points to scale.")
+        return scaled_bases, original_bases, factors  # No scaling if no valid points
+
+    mouth_center = calculate_mouth_center(face_xy)
+    nose_scaled, nose_original = scaled_body_xy[BODY_INDEX["Nose"]], original_body_xy[BODY_INDEX["Nose"]]
+    if mouth_center is not None and not np.isnan(nose_scaled).any() and not np.isnan(nose_original).any():
+        scaled_mouth_center = tuple((nose_scaled + (np.array(mouth_center) - nose_original) * height_ratio).tolist())
+    else:
+        logging.warning("Mouth center could not be calculated; skipping mouth scaling.")
+        scaled_mouth_center = None
+
+    # The per-region messages are only formatted when they would be emitted
+    log_info = logging.getLogger().isEnabledFor(logging.INFO)
+    log_debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    for region_name, indices, base_keypoint, factor_key in FACE_REGIONS:
+        if base_keypoint is None:
+            # The mouth is aligned on its own center, carried along with the nose
+            base_keypoint = scaled_base = scaled_mouth_center
+            original_base = mouth_center
+        else:
+            scaled_base = tuple(scaled_body_xy[BODY_INDEX[base_keypoint]].tolist())
+            original_base = tuple(original_body_xy[BODY_INDEX[base_keypoint]].tolist())
+        if log_info:
+            logging.info(f"Scaling region '{region_name}' with base '{base_keypoint}' and factor '{factor_key}'.")
+
+        if scaled_base is None or original_base is None or np.isnan(scaled_base + original_base).any():
+            logging.warning(f"Base keypoint {base_keypoint} missing for scaling {factor_key}.")
+            continue
+
+        indices = indices[indices < num_points]
+        scaled_bases[indices] = scaled_base
+        original_bases[indices] = original_base
+        factors[indices] = scaling_factors.get(factor_key, 1.0) * height_ratio
+        if log_debug:
+            logging.debug(
+                f"Region '{factor_key}' uses base {base_keypoint}: original_base={original_base}, "
+                f"scaled_base={scaled_base}, factor={scaling_factors.get(factor_key, 1.0)}"
+            )
+
+    return scaled_bases, original_bases, factors
+
+def scale_face_xy(
+    face_xy: np.ndarray,
+    scaling_factors: dict,
+    height_ratio: float,
+    scaled_body_xy: np.ndarray,
+    original_body_xy: np.ndarray,
+) -> np.ndarray:
+    """
+    Scales and aligns facial keypoints based on scaled and original body keypoints.
+
+    Parameters:
+        face_xy (np.ndarray): (N, 2) original facial keypoints, NaN for missing points.
+        scaling_factors (dict): Scaling factors for different facial regions.
+        height_ratio (float): Ratio of target height to input height.
+        scaled_body_xy (np.ndarray): (18, 2) scaled body keypoints in COCO order, NaN for missing joints.
+        original_body_xy (np.ndarray): (18, 2) original body keypoints in COCO order, NaN for missing joints.
+
+    Returns:
+        np.ndarray: New (N, 2) array of scaled and aligned facial keypoints.
+    """
+    points_xy = np.array(face_xy, dtype=float).reshape(-1, 2)
+    scaled_bases, original_bases, factors = face_scaling_params(
+        points_xy, scaling_factors, height_ratio, scaled_body_xy, original_body_xy
+    )
+    return affine_scale_inplace(points_xy, factors[:, None], scaled_bases, original_bases)
+
+def _keypoints_to_xy(keypoints: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """Converts a {name: (x, y)} dict of body keypoints to an (18, 2) array in COCO order, NaN where missing."""
+    body_xy = np.full((len(COCO_KEYPOINTS_ORDER), 2), np.nan)
+    for name, point in keypoints.items():
+        if point is not None and len(point) and name in BODY_INDEX:
+            body_xy[BODY_INDEX[name]] = point[:2]
+    return body_xy
 
 def scale_face(
     face_points: List[Optional[Tuple[float, float]]],
@@ -179,7 +427,7 @@ def scale_face(
     original_keypoints: Dict[str, Tuple[float, float]],
 ) -> List[Optional[Tuple[float, float]]]:
     """
-    Scales and aligns facial keypoints based on scaled and original body keypoints.
+    List and dict based front end of scale_face_xy.
 
     Parameters:
         face_points (List[Optional[Tuple[float, float]]]): List of original facial keypoints.
@@ -191,110 +439,18 @@ def scale_face(
     Returns:
         List[Optional[Tuple[float, float]]]: Scaled and aligned facial keypoints.
     """
-
     if not face_points or all(point is None for point in face_points):
         logging.warning("No face points to scale.")
         return face_points  # No scaling if no valid points
 
-    def calculate_mouth_center(face_points, indices=range(48, 68)):
-        """
-        Calculates the center of the mouth as the mean position of valid points in the specified range.
-
-        Parameters:
-            face_points (List[Optional[Tuple[float, float]]]): List of facial keypoints.
-            indices (range): Range of indices representing the mouth region.
-
-        Returns:
-            Optional[Tuple[float, float]]: Calculated center of the mouth, or None if no valid points.
-        """
-        valid_points = [face_points[i] for i in indices if face_points[i] is not None]
-        if not valid_points:
-            return None
-        cx = sum(p[0] for p in valid_points) / len(valid_points)
-        cy = sum(p[1] for p in valid_points) / len(valid_points)
-        return (cx, cy)
-
-    mouth_center = calculate_mouth_center(face_points)
-    if mouth_center:
-        scaled_mouth_center = (
-            scaled_keypoints["Nose"][0] + (mouth_center[0] - original_keypoints["Nose"][0]) * height_ratio,
-            scaled_keypoints["Nose"][1] + (mouth_center[1] - original_keypoints["Nose"][1]) * height_ratio,
-        )
-    else:
-        logging.warning("Mouth center could not be calculated; skipping mouth scaling.")
-        scaled_mouth_center = None
-
-    # Define facial regions based on COCO format
-    regions = {
-        # Face contour (0-16 inclusive)
-        "face_contour": ([0, 1, 2, 3, 4, 5, 11, 12, 13, 14, 15, 16], "Nose", "face_contour_factor"),
-        # Jaw (6-10 inclusive)
-        "jaw": (range(6, 11), "Nose", "jaw_factor"),
-        # Right eyebrow (17-21 inclusive)
-        "right_eyebrow": (range(17, 22), "REye", "eye_factor"),
-        # Left eyebrow (22-26 inclusive)
-        "left_eyebrow": (range(22, 27), "LEye", "eye_factor"),
-        # Nose (27-35 inclusive)
-        "nose": (range(27, 36), "Nose", "nose_factor"),
-        # Right eye (36-41 inclusive)
-        "right_eye": (range(36, 42), "REye", "eye_factor"),
-        # Left eye (42-47 inclusive)
-        "left_eye": (range(42, 48), "LEye", "eye_factor"),
-        # Mouth (48-70 inclusive)
-        "mouth": (range(48, 71), scaled_mouth_center, "mouth_factor"),
-    }
-
-
-    def scale_region(indices: range, base_keypoint: Union[str, Tuple[float, float]], factor_key: str):
-        """
-        Scale a region of facial points around a base position.
-
-        Parameters:
-            indices (range): Indices of points in the region.
-            base_keypoint (Union[str, Tuple[float, float]]): Keypoint in `scaled_keypoints` 
-                                                            or a calculated tuple used as the alignment base.
-            factor_key (str): Key to fetch the scaling factor for this region.
-        """
-        if isinstance(base_keypoint, str):
-            scaled_base = scaled_keypoints.get(base_keypoint)
-            original_base = original_keypoints.get(base_keypoint)
-        else:
-            scaled_base = base_keypoint
-            original_base = mouth_center  # Use the calculated mouth center for mouth region
-
-        if not scaled_base or not original_base:
-            logging.warning(f"Base keypoint {base_keypoint} missing for scaling {factor_key}.")
-            return
-
-        sx, sy = scaled_base
-        ox, oy = original_base
-        scaling_factor = scaling_factors.get(factor_key, 1.0)
-
-        for i in indices:
-            if i < len(face_points) and face_points[i] is not None:
-                x, y = face_points[i]
-                dx, dy = x - ox, y - oy
-                face_points[i] = (
-                    sx + dx * scaling_factor * height_ratio,
-                    sy + dy * scaling_factor * height_ratio,
-                )
-                logging.debug(
-                    f"Scaled point {i} in region '{factor_key}' using base {base_keypoint}: "
-                    f"original_base=({ox}, {oy}), scaled_base=({sx}, {sy}), "
-                    f"original=({x}, {y}), scaled=({face_points[i][0]}, {face_points[i][1]})"
-                )
-
-    # Apply scaling to all defined regions
-    for region_name, (indices, base_keypoint, factor_key) in regions.items():
-        logging.info(f"Scaling region '{region_name}' with base '{base_keypoint}' and factor '{factor_key}'.")
-        scale_region(indices, base_keypoint, factor_key)
-
-    # Convert to tuples of float for consistency
-    face_points = [
-        (float(point[0]), float(point[1])) if point is not None else None for point in face_points
-    ]
-
-    return face_points
+    face_xy = np.array(
+        [(np.nan, np.nan) if point is None else point for point in face_points], dtype=float
+    ).reshape(-1, 2)
+    scaled_xy = scale_face_xy(
+        face_xy, scaling_factors, height_ratio,
+        _keypoints_to_xy(scaled_keypoints), _keypoints_to_xy(original_keypoints),
+    )
+    return [None if np.isnan(x) else (x, y) for x, y in scaled_xy.tolist()]
 
 # Define scaling and alignment function for hands and feet
 def scale_and_align_points(
@@ -307,7 +463,8 @@ def scale_and_align_points(
     Scales and aligns a set of points relative to the original and scaled base points.
 
     Parameters:
-        points (List[Optional[Tuple[float, float]]]): List of points to scale and align.
+        points (List[Optional[Tuple[float, float]]]): List of points to scale and align; an (N, 2)
+            array with NaN for missing points is accepted as well.
         scaling_factor (float): Scaling factor for the region.
         scaled_base (Tuple[float, float]): Scaled position of the base keypoint.
         original_base (Tuple[float, float]): Original position of the base keypoint.
@@ -315,18 +472,15 @@ def scale_and_align_points(
     Returns:
         List[Optional[Tuple[float, float]]]: Scaled and aligned points.
     """
-    if not points or not scaled_base or not original_base:
+    if len(points) == 0 or scaled_base is None or original_base is None or len(scaled_base) == 0 or len(original_base) == 0:
         logging.warning("Skipping scaling: invalid base keypoint or empty points.")
         return points
 
-    scaled_points = []
-    for point in points:
-        if point is not None:
-            dx, dy = point[0] - original_base[0], point[1] - original_base[1]
-            scaled_points.append((
-                scaled_base[0] + dx * scaling_factor,
-                scaled_base[1] + dy * scaling_factor
-            ))
-        else:
-            scaled_points.append(None)
-    return scaled_points
+    # Missing points become NaN, pass through the affine untouched and come back out as None
+    points_xy = np.array(
+        [(np.nan, np.nan) if point is None else point for point in points], dtype=float
+    ).reshape(-1, 2)
+    scaled_xy = affine_scale_inplace(
+        points_xy, scaling_factor, np.asarray(scaled_base, dtype=float), np.asarray(original_base, dtype=float)
+    )
+    return [None if np.isnan(x) else (float(x), float(y)) for x, y in scaled_xy.tolist()]
@@ -1,10 +1,15 @@
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import cv2
 import numpy as np
-import networkx as nx
 import logging
+import warnings
 
-from Pose import Pose
+from Pose import Pose, JOINT_INDEX, valid_mask
+from anchor_point import COCO_KEYPOINTS_ORDER
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 logging.basicConfig(level=logging.WARNING)
 
@@ -39,9 +44,34 @@ region_colors = {
     "left_foot": (255, 255, 0),
 }
 
-def build_pose_graph(pose: Pose) -> nx.Graph:
+# Skeleton edges based on COCO keypoints
+SKELETON_EDGES = [
+    ("Nose", "Neck"), ("Neck", "RShoulder"), ("RShoulder", "RElbow"),
+    ("RElbow", "RWrist"), ("Neck", "LShoulder"), ("LShoulder", "LElbow"),
+    ("LElbow", "LWrist"), ("Neck", "RHip"), ("RHip", "RKnee"),
+    ("RKnee", "RAnkle"), ("Neck", "LHip"), ("LHip", "LKnee"),
+    ("LKnee", "LAnkle"), ("Nose", "REye"), ("REye", "REar"),
+    ("Nose", "LEye"), ("LEye", "LEar")
+]
+
+# The same edges as (start, end) rows into Pose.body_xy
+LIMB_INDICES = np.array([[JOINT_INDEX[start], JOINT_INDEX[end]] for start, end in SKELETON_EDGES], dtype=np.int32)
+
+# Line color of each edge, the blend of its two joint colors (white for joints without a color)
+EDGE_COLORS = {
+    (start, end): tuple(
+        ((np.array(colors.get(start, (255, 255, 255))) + colors.get(end, (255, 255, 255))) // 2).tolist()
+    )
+    for start, end in SKELETON_EDGES
+}
+
+# Dot color of each joint, by row of Pose.body_xy (white for joints without a color)
+JOINT_COLORS = [colors.get(name, (255, 255, 255)) for name in COCO_KEYPOINTS_ORDER]
+
+def build_pose_nx_graph(pose: Pose) -> "nx.Graph":
     """
-    Builds a graph representation of a Pose object.
+    Builds a graph representation of a Pose object. NetworkX is an optional dependency that is only
+    imported here and is not required for drawing.
 
     Parameters:
         pose (Pose): A Pose object containing body keypoints.
@@ -49,36 +79,37 @@ def build_pose_graph(pose: Pose) -> nx.Graph:
     Returns:
         nx.Graph: A NetworkX graph representing the pose.
     """
-    G = nx.Graph()
+    try:
+        import networkx as nx
+    except ImportError as e:
+        raise ImportError(
+            "build_pose_nx_graph requires the optional 'networkx' package; install it with 'pip install networkx'."
+        ) from e
 
-    # Define edges based on COCO keypoints
-    edges = [
-        ("Nose", "Neck"), ("Neck", "RShoulder"), ("RShoulder", "RElbow"),
-        ("RElbow", "RWrist"), ("Neck", "LShoulder"), ("LShoulder", "LElbow"),
-        ("LElbow", "LWrist"), ("Neck", "RHip"), ("RHip", "RKnee"),
-        ("RKnee", "RAnkle"), ("Neck", "LHip"), ("LHip", "LKnee"),
-        ("LKnee", "LAnkle"), ("Nose", "REye"), ("REye", "REar"),
-        ("Nose", "LEye"), ("LEye", "LEar")
-    ]
+    G = nx.Graph()
+    body_xy = pose.body_xy
+    valid = valid_mask(body_xy)
 
     # Add nodes for all valid keypoints
-    for keypoint, coords in pose.body.items():
-        if coords is not None and not np.any(np.isnan(coords)):  # Ensure keypoint is valid
-            G.add_node(keypoint, pos=coords)
-        else:
-            logging.warning(f"Invalid or missing keypoint: {keypoint} with coords: {coords}")
+    present = np.flatnonzero(valid)
+    G.add_nodes_from(
+        (COCO_KEYPOINTS_ORDER[i], {"pos": (x, y)}) for i, (x, y) in zip(present.tolist(), body_xy[present].tolist())
+    )
 
     # Add edges only if both keypoints are present
-    for start, end in edges:
-        if start in G and end in G:
-            G.add_edge(start, end)
-        else:
-            missing = [k for k in [start, end] if k not in G]
-            logging.warning(f"Missing keypoint(s) {missing} for edge ({start}, {end}).")
+    limb_mask = valid[LIMB_INDICES].all(axis=1)
+    G.add_edges_from(SKELETON_EDGES[edge] for edge in np.flatnonzero(limb_mask))
+    for edge in np.flatnonzero(~limb_mask):
+        start, end = SKELETON_EDGES[edge]
+        missing = [k for k in [start, end] if k not in G]
+        logging.warning(f"Missing keypoint(s) {missing} for edge ({start}, {end}).")
 
     return G
 
-def create_graphs_for_poses(poses: List[Pose]) -> List[nx.Graph]:
+# Former name of build_pose_nx_graph
+build_pose_graph = build_pose_nx_graph
+
+def create_graphs_for_poses(poses: List[Pose]) -> List["nx.Graph"]:
     """
     Creates a list of graphs for multiple poses.
 
@@ -88,58 +119,112 @@ def create_graphs_for_poses(poses: List[Pose]) -> List[nx.Graph]:
     Returns:
         List[nx.Graph]: A list of graphs, one for each Pose.
     """
-    graphs = []
-    for pose in poses:
-        graph = build_pose_graph(pose)
-        graphs.append(graph)
-    return graphs
+    return [build_pose_nx_graph(pose) for pose in poses]
 
-def draw_pose_with_graph(canvas: np.ndarray, pose: Pose, graph: nx.Graph) -> None:
+def collect_pose_primitives(
+    pose: Pose,
+    segments: Dict[Tuple[int, int, int], List[np.ndarray]],
+    points: Dict[Tuple[Tuple[int, int, int], int], List[np.ndarray]],
+) -> None:
     """
-    Draws a pose on the given canvas using a graph representation.
+    Collects the lines and dots of a pose without drawing them, so that any number of poses
+    can be rendered with one OpenCV call per color. Limbs are read straight from `pose.body_xy`
+    through LIMB_INDICES, without building an intermediate graph.
 
     Parameters:
-        canvas (np.ndarray): The canvas to draw on.
         pose (Pose): The Pose object containing keypoints.
-        graph (nx.Graph): The graph representation of the pose.
+        segments (Dict[Tuple[int, int, int], List[np.ndarray]]): Edge endpoints as (2, 2) int32 pixel arrays,
+            grouped by line color. Updated in place.
+        points (Dict[Tuple[Tuple[int, int, int], int], List[np.ndarray]]): Dot centers as int32
+            (x, y) pixel rows, grouped by (color, radius). Updated in place.
     """
-    # Draw edges (connections between joints)
-    for start, end in graph.edges:
-        if start in graph.nodes and end in graph.nodes:
-            start_pos = graph.nodes[start]["pos"]
-            end_pos = graph.nodes[end]["pos"]
-            start_color = colors.get(start, (255, 255, 255))  # Default to white
-            end_color = colors.get(end, (255, 255, 255))      # Default to white
-
-            # Draw the edge
-            cv2.line(
-                canvas,
-                (int(start_pos[0]), int(start_pos[1])),
-                (int(end_pos[0]), int(end_pos[1])),
-                color=tuple(np.mean([start_color, end_color], axis=0).astype(int).tolist()),  # Fix
-                thickness=2
-            )
-        else:
-            logging.warning(f"Skipping edge ({start}, {end}) with invalid positions: {start_pos}, {end_pos}")
-
-    # Draw nodes (keypoints)
-    for node, data in graph.nodes(data=True):
-        pos = data.get("pos")
-        if pos is not None and not np.any(np.isnan(pos)):  # Check for NaN
-            color = colors.get(node, (255, 255, 255))  # Default to white
-            cv2.circle(canvas, (int(pos[0]), int(pos[1])), radius=4, color=color, thickness=-1)
-        else:
-            logging.warning(f"Skipping node {node} with invalid position: {pos}")
-
-    # Draw face, hand, and foot points using region colors
-    for region, points in [
-        ("face", pose.face),
-        ("right_hand", pose.right_hand),
-        ("left_hand", pose.left_hand),
-        ("right_foot", pose.right_foot),
-        ("left_foot", pose.left_foot)
+    body_xy = pose.body_xy
+    valid = valid_mask(body_xy)
+    # Pixel coordinates, truncated once per pose as OpenCV would; missing rows become 0 and are never read
+    body_i32 = np.nan_to_num(body_xy).astype(np.int32)
+
+    # Edges (connections between joints) whose two ends are both present, as (E, 2, 2) endpoints
+    limb_mask = valid[LIMB_INDICES].all(axis=1)
+    endpoints = body_i32[LIMB_INDICES]
+    for edge in np.flatnonzero(limb_mask):
+        segments.setdefault(EDGE_COLORS[SKELETON_EDGES[edge]], []).append(endpoints[edge])
+
+    # Nodes (keypoints)
+    for i in np.flatnonzero(valid):
+        points.setdefault((JOINT_COLORS[i], 4), []).append(body_i32[i])
+
+    # Face, hand, and foot points using region colors
+    for region, region_xy in [
+        ("face", pose.face_xy),
+        ("right_hand", pose.right_hand_xy),
+        ("left_hand", pose.left_hand_xy),
+        ("right_foot", pose.right_foot_xy),
+        ("left_foot", pose.left_foot_xy)
     ]:
-        color = region_colors[region]
-        for point in points:
-            if point:
-                cv2.circle(canvas, (int(point[0]), int(point[1])), radius=2, color=color, thickness=-1)
\ No newline at end of file
+        dots = points.setdefault((region_colors[region], 2), [])
+        dots.extend(region_xy[valid_mask(region_xy)].astype(np.int32))
+
+@lru_cache(maxsize=None)
+def _dot_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(dy, dx) pixel offsets of a filled cv2.circle of `radius` around its center."""
+    stamp = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.uint8)
+    cv2.circle(stamp, (radius, radius), radius=radius, color=1, thickness=-1)
+    dy, dx = np.nonzero(stamp)
+    return dy - radius, dx - radius
+
+def draw_primitives(
+    canvas: np.ndarray,
+    segments: Dict[Tuple[int, int, int], List[np.ndarray]],
+    points: Dict[Tuple[Tuple[int, int, int], int], List[np.ndarray]],
+) -> None:
+    """
+    Draws primitives gathered by `collect_pose_primitives`: one polylines call per line color,
+    then the dots of each (color, radius) group.
+
+    The z-order follows the groups, not the poses: line colors are drawn in the order they were first
+    collected, and every dot lands on top of every line. Where lines of different colors cross, or
+    where poses overlap, this can stack pixels differently from drawing each pose edge by edge.
+
+    Parameters:
+        canvas (np.ndarray): The canvas to draw on.
+        segments (Dict[Tuple[int, int, int], List[np.ndarray]]): Edge endpoints as (2, 2) int32 pixel
+            arrays, grouped by color.
+        points (Dict[Tuple[Tuple[int, int, int], int], List[np.ndarray]]): Dot centers as int32 (x, y)
+            pixel rows, grouped by (color, radius).
+    """
+    # Grouped by color, so a later color paints over an earlier one wherever lines cross
+    for color, color_segments in segments.items():
+        cv2.polylines(canvas, np.stack(color_segments).astype(np.int32, copy=False), isClosed=False, color=color, thickness=2)
+
+    # Dots go over all lines, including lines of poses collected after them.
+    # OpenCV has no batched circle primitive; stamp all dots of a group with one fancy-indexed write
+    height, width = canvas.shape[:2]
+    for (color, radius), centers in points.items():
+        if centers:
+            dy, dx = _dot_offsets(radius)
+            centers = np.asarray(centers).astype(np.int32, copy=False)
+            ys = (centers[:, 1:2] + dy).ravel()
+            xs = (centers[:, 0:1] + dx).ravel()
+            inside = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+            canvas[ys[inside], xs[inside]] = color
+
+def draw_pose_with_graph(canvas: np.ndarray, pose: Pose, graph: "nx.Graph" = None) -> None:
+    """
+    Draws a pose on the given canvas. The skeleton is drawn from `pose.body_xy`, which yields the
+    same nodes and edges as the pose graph.
+
+    Parameters:
+        canvas (np.ndarray): The canvas to draw on.
+        pose (Pose): The Pose object containing keypoints.
+        graph (nx.Graph): Deprecated and ignored; passing it emits a DeprecationWarning.
+    """
+    if graph is not None:
+        warnings.warn(
+            "draw_pose_with_graph ignores its `graph` argument, which will be removed; the pose is drawn "
+            "from pose.body_xy.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    segments, points = {}, {}
+    collect_pose_primitives(pose, segments, points)
+    draw_primitives(canvas, segments, points)